@@ -0,0 +1,116 @@
+from codigos import avanzar_series
+from db import DB_BACKEND, get_conn, qall
+
+# Postgres: la fila leída queda bloqueada hasta el commit (SQLite ya serializa las escrituras)
+_BLOQUEO = " FOR UPDATE" if DB_BACKEND == "postgres" else ""
+
+
+def listar_comites():
+    return qall("SELECT id, nombre FROM comites ORDER BY nombre")
+
+
+def registrar(comite_id, codigo, nombre: str, descripcion: str, estado: str):
+    """
+    Inserta el activo y su movimiento REGISTRO (estado inicial para
+    "Inventario a la fecha") en la misma transacción.
+    Un código escrito a mano con el prefijo de una serie la hace avanzar.
+    Retorna el id del activo.
+    """
+    conn = get_conn()
+    try:
+        with conn.cursor() as cur:
+            avanzar_series(cur, [codigo])
+            cur.execute(
+                """
+                INSERT INTO activos(
+                    codigo, nombre, descripcion, estado,
+                    fecha_registro,
+                    categoria_id, ubicacion_id, responsable_id, comite_id
+                )
+                VALUES (%s,%s,%s,%s, NOW(), NULL, NULL, NULL, %s)
+                RETURNING id
+                """,
+                (codigo, nombre, descripcion, estado, comite_id),
+            )
+            aid = cur.fetchone()["id"]
+            cur.execute(
+                """
+                INSERT INTO movimientos(activo_id, tipo, detalle, estado_nuevo, fecha)
+                VALUES (%s, %s, %s, %s, NOW())
+                """,
+                (aid, "REGISTRO", "Registro del activo", estado),
+            )
+        conn.commit()
+        return aid
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def dar_de_baja(activo_id, detalle: str = "Marcado como BAJA desde listado"):
+    """
+    Estado previo + UPDATE + movimiento CAMBIO_ESTADO en una transacción.
+    Retorna (ok, msg).
+    """
+    conn = get_conn()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(f"SELECT estado FROM activos WHERE id=%s{_BLOQUEO}", (activo_id,))
+            previo = cur.fetchone()
+            if not previo:
+                return False, "No existe un activo con ese ID (o está archivado)."
+
+            cur.execute("UPDATE activos SET estado='BAJA' WHERE id=%s", (activo_id,))
+            cur.execute(
+                """
+                INSERT INTO movimientos(activo_id, tipo, detalle, estado_anterior, estado_nuevo, fecha)
+                VALUES (%s, %s, %s, %s, %s, NOW())
+                """,
+                (activo_id, "CAMBIO_ESTADO", detalle, previo["estado"], "BAJA"),
+            )
+        conn.commit()
+        return True, "Listo ✅"
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def eliminar(activo_id):
+    """
+    Borra definitivamente el activo y sus movimientos (caliente o archivo).
+    El borrado queda en activos_eliminados para que el inventario a la fecha
+    lo quite desde ese momento (los checkpoints anteriores lo siguen teniendo).
+    Retorna (ok, msg).
+    """
+    conn = get_conn()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                INSERT INTO activos_eliminados(activo_id, comite_id, fecha)
+                SELECT id, comite_id, NOW() FROM activos WHERE id=%s
+                UNION ALL
+                SELECT id, comite_id, NOW() FROM activos_archivo WHERE id=%s
+                ON CONFLICT (activo_id) DO UPDATE SET fecha = EXCLUDED.fecha
+                """,
+                (activo_id, activo_id),
+            )
+            if not cur.rowcount:
+                return False, f"No existe un activo con ID {activo_id}."
+
+            cur.execute("DELETE FROM movimientos WHERE activo_id=%s", (activo_id,))
+            cur.execute("DELETE FROM activos WHERE id=%s", (activo_id,))
+            # puede venir del archivo ("Incluir archivados")
+            cur.execute("DELETE FROM movimientos_archivo WHERE activo_id=%s", (activo_id,))
+            cur.execute("DELETE FROM activos_archivo WHERE id=%s", (activo_id,))
+        conn.commit()
+        return True, "Eliminado ✅"
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
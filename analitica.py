@@ -0,0 +1,213 @@
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+from db import DATA_DIR, qall, qone
+
+# Snapshot columnar para reportes: se consulta localmente, nunca contra Postgres
+ANALITICA_DIR = Path(os.getenv("ANALITICA_DIR", str(DATA_DIR / "analitica")))
+ESTADO_PATH = ANALITICA_DIR / "_estado.json"
+CATALOGOS = ("comites", "categorias", "ubicaciones", "responsables")
+# Ids que se releen detrás de cada marca de agua: los SERIAL pueden confirmarse
+# fuera de orden (lo repetido se descarta al leer, por _lote)
+VENTANA = int(os.getenv("ANALITICA_VENTANA", "100"))
+
+
+def _requiere(modulo: str):
+    """
+    pyarrow/duckdb son opcionales: solo los necesita la analítica.
+    """
+    try:
+        return __import__(modulo)
+    except ImportError as e:
+        raise RuntimeError(
+            f"La analítica necesita '{modulo}' instalado (pip install {modulo})."
+        ) from e
+
+
+def leer_estado():
+    if ESTADO_PATH.exists():
+        return json.loads(ESTADO_PATH.read_text(encoding="utf-8"))
+    return {
+        "lote": 0,
+        "max_activo_id": 0,
+        "max_movimiento_id": 0,
+        "max_fecha_archivo": None,
+        "actualizado": None,
+    }
+
+
+def _escribir_parquet(df: pd.DataFrame, base: Path, particion: str, lote: int):
+    """
+    Un archivo por partición y lote: base/<particion>=<valor>/lote-00001.parquet
+    """
+    for valor, grupo in df.groupby(particion):
+        carpeta = base / f"{particion}={valor}"
+        carpeta.mkdir(parents=True, exist_ok=True)
+        grupo.drop(columns=[particion]).to_parquet(
+            carpeta / f"lote-{lote:05d}.parquet", index=False
+        )
+
+
+def exportar_snapshot():
+    """
+    Exporta a Parquet lo nuevo desde el último snapshot (marcas de agua):
+    - activos nuevos, con movimientos nuevos o recién archivados
+      (la versión más reciente gana al leer)
+    - movimientos nuevos (particionados por año)
+    - catálogos completos (son chicos)
+    Retorna el estado guardado.
+    """
+    _requiere("pyarrow")
+    ANALITICA_DIR.mkdir(parents=True, exist_ok=True)
+    estado = leer_estado()
+    lote = estado["lote"] + 1
+
+    desde_activo = max(0, estado["max_activo_id"] - VENTANA)
+    desde_movimiento = max(0, estado["max_movimiento_id"] - VENTANA)
+    # archivar no deja movimiento: lo archivado se detecta por fecha_archivo.
+    # La marca se toma antes de exportar (lo archivado mientras tanto se relee la próxima
+    # vez) y se compara con >= (SQLite guarda la hora al segundo)
+    fecha_archivo = qone("SELECT MAX(fecha_archivo) AS f FROM activos_archivo")["f"]
+    desde_archivo = estado.get("max_fecha_archivo")
+    desde_archivo = datetime.fromisoformat(desde_archivo) if desde_archivo else datetime(1900, 1, 1)
+
+    activos = pd.DataFrame(
+        qall(
+            """
+            SELECT id, codigo, nombre, estado, fecha_registro,
+                   categoria_id, ubicacion_id, responsable_id, comite_id, FALSE AS archivado
+            FROM activos WHERE id > %s
+            UNION
+            SELECT id, codigo, nombre, estado, fecha_registro,
+                   categoria_id, ubicacion_id, responsable_id, comite_id, FALSE AS archivado
+            FROM activos WHERE id IN (SELECT activo_id FROM movimientos WHERE id > %s)
+            UNION
+            SELECT id, codigo, nombre, estado, fecha_registro,
+                   categoria_id, ubicacion_id, responsable_id, comite_id, TRUE AS archivado
+            FROM activos_archivo WHERE id > %s
+            UNION
+            SELECT id, codigo, nombre, estado, fecha_registro,
+                   categoria_id, ubicacion_id, responsable_id, comite_id, TRUE AS archivado
+            FROM activos_archivo WHERE id IN (SELECT activo_id FROM movimientos_archivo WHERE id > %s)
+            UNION
+            SELECT id, codigo, nombre, estado, fecha_registro,
+                   categoria_id, ubicacion_id, responsable_id, comite_id, TRUE AS archivado
+            FROM activos_archivo WHERE fecha_archivo >= %s
+            """,
+            # una rama por condición (un OR entre id e IN impide usar los índices)
+            (desde_activo, desde_movimiento) * 2 + (desde_archivo,),
+        )
+    )
+    movimientos = pd.DataFrame(
+        qall(
+            """
+            SELECT id, activo_id, fecha, tipo, detalle, estado_anterior, estado_nuevo
+            FROM movimientos WHERE id > %s
+            UNION ALL
+            SELECT id, activo_id, fecha, tipo, detalle, estado_anterior, estado_nuevo
+            FROM movimientos_archivo WHERE id > %s
+            """,
+            (desde_movimiento, desde_movimiento),
+        )
+    )
+
+    if not activos.empty:
+        activos["archivado"] = activos["archivado"].astype(bool)
+        activos["_lote"] = lote
+        _escribir_parquet(activos, ANALITICA_DIR / "activos", "comite_id", lote)
+        estado["max_activo_id"] = max(estado["max_activo_id"], int(activos["id"].max()))
+
+    if not movimientos.empty:
+        movimientos["fecha"] = pd.to_datetime(movimientos["fecha"])
+        movimientos["anio"] = movimientos["fecha"].dt.year
+        movimientos["_lote"] = lote
+        _escribir_parquet(movimientos, ANALITICA_DIR / "movimientos", "anio", lote)
+        estado["max_movimiento_id"] = max(estado["max_movimiento_id"], int(movimientos["id"].max()))
+
+    if fecha_archivo is not None:
+        estado["max_fecha_archivo"] = str(fecha_archivo)
+
+    for cat in CATALOGOS:
+        pd.DataFrame(qall(f"SELECT id, nombre FROM {cat}"), columns=["id", "nombre"]).to_parquet(
+            ANALITICA_DIR / f"{cat}.parquet", index=False
+        )
+
+    estado["lote"] = lote
+    estado["actualizado"] = datetime.now().isoformat(timespec="seconds")
+    ESTADO_PATH.write_text(json.dumps(estado, indent=2), encoding="utf-8")
+    return estado
+
+
+def conectar():
+    """
+    DuckDB en memoria con vistas sobre el snapshot:
+    activos (última versión de cada id), movimientos y catálogos.
+    Los activos eliminados después de exportados siguen apareciendo (el snapshot no borra).
+    """
+    duckdb = _requiere("duckdb")
+    if not (ANALITICA_DIR / "activos").exists():
+        raise RuntimeError("Todavía no hay snapshot con activos. Ejecuta la exportación primero.")
+
+    d = ANALITICA_DIR.as_posix()
+    con = duckdb.connect()
+    con.execute(
+        f"""
+        CREATE VIEW activos AS
+        SELECT * EXCLUDE (_lote) FROM read_parquet('{d}/activos/*/*.parquet', hive_partitioning = true, union_by_name = true)
+        QUALIFY row_number() OVER (PARTITION BY id ORDER BY _lote DESC) = 1
+        """
+    )
+    if (ANALITICA_DIR / "movimientos").exists():
+        con.execute(
+            f"""
+            CREATE VIEW movimientos AS
+            SELECT * EXCLUDE (_lote) FROM read_parquet('{d}/movimientos/*/*.parquet', hive_partitioning = true, union_by_name = true)
+            QUALIFY row_number() OVER (PARTITION BY id ORDER BY _lote DESC) = 1
+            """
+        )
+    else:
+        # activos viejos sin movimientos: vista vacía con las columnas que usan los reportes
+        con.execute(
+            "CREATE VIEW movimientos AS SELECT NULL::TIMESTAMP AS fecha, NULL::VARCHAR AS tipo WHERE FALSE"
+        )
+    for cat in CATALOGOS:
+        con.execute(f"CREATE VIEW {cat} AS SELECT * FROM read_parquet('{d}/{cat}.parquet')")
+    return con
+
+
+def cruce_comite_categoria_estado(con) -> pd.DataFrame:
+    return con.execute(
+        """
+        SELECT
+          co.nombre AS comite,
+          COALESCE(c.nombre, '(sin categoría)') AS categoria,
+          a.estado,
+          COUNT(*) AS total
+        FROM activos a
+        LEFT JOIN comites co ON co.id = a.comite_id
+        LEFT JOIN categorias c ON c.id = a.categoria_id
+        GROUP BY ALL
+        ORDER BY comite, categoria, a.estado
+        """
+    ).df()
+
+
+def movimientos_por_periodo(con, periodo: str = "month") -> pd.DataFrame:
+    if periodo not in ("year", "quarter", "month"):
+        raise ValueError("periodo debe ser year, quarter o month")
+    return con.execute(
+        f"""
+        SELECT date_trunc('{periodo}', fecha) AS periodo, tipo, COUNT(*) AS total
+        FROM movimientos
+        GROUP BY ALL
+        ORDER BY periodo, tipo
+        """
+    ).df()
+
+
+if __name__ == "__main__":
+    print("SNAPSHOT =", exportar_snapshot())
@@ -1,8 +1,21 @@
+import json
+from collections import deque
+from datetime import datetime, time
+
 import streamlit as st
 import pandas as pd
 
-from db import init_db, qone, qall, exec_sql
-from auth import login, crear_usuario_admin
+import activos
+import analitica
+import duplicados
+import perfil
+import resumen
+from db import init_db
+from auth import crear_usuario_admin, eliminar_usuarios, listar_usuarios, login
+from codigos import configurar_serie, formatear, importar_activos, reservar_codigos, serie_comite
+from archivo import DIAS_BAJA, archivar_bajas
+from filtros import FiltroActivos, consultar_listado
+from inventario import crear_checkpoint, inventario_a_la_fecha
 
 st.set_page_config(page_title="RAP Amazonía - Gestión de Activos", layout="wide")
 
@@ -28,7 +41,7 @@ def comite_scope():
     - OPERADOR: fijo a su comité
     """
     user = st.session_state["user"]
-    comites = qall("SELECT id, nombre FROM comites ORDER BY nombre")
+    comites = activos.listar_comites()
     id2name = {c["id"]: c["nombre"] for c in comites}
 
     if user["rol"] == "ADMIN":
@@ -65,77 +78,34 @@ def pantalla_login():
 # ======================
 # Dashboard
 # ======================
+@perfil.perfilado("dashboard")
 def dashboard():
     user = st.session_state["user"]
 
     # ✅ ADMIN: vista global; OPERADOR: su comité (y etiqueta correcta)
     if user["rol"] == "ADMIN":
-        where, params, label = "", (), "Todos"
+        comite_id, label = None, "Todos"
     else:
-        where, params, label = comite_scope()
+        _, params, label = comite_scope()
+        comite_id = params[0]
 
     st.caption(f"Vista: **{label}**")
 
-    df = pd.DataFrame(
-        qall(
-            f"""
-            SELECT estado, COUNT(*) as total
-            FROM activos a
-            {where}
-            GROUP BY estado
-            """,
-            params,
-        )
-    )
-
-    total = int(df["total"].sum()) if not df.empty else 0
-    activos = int(df[df["estado"] == "ACTIVO"]["total"].sum()) if not df.empty else 0
-    rep = int(df[df["estado"] == "REPARACION"]["total"].sum()) if not df.empty else 0
-    baja = int(df[df["estado"] == "BAJA"]["total"].sum()) if not df.empty else 0
+    # Contadores mantenidos por triggers (resumen.py): sin recorrer activos
+    r = resumen.leer(comite_id)
 
     a, b, c, d = st.columns(4)
-    a.metric("Total", total)
-    b.metric("ACTIVO", activos)
-    c.metric("REPARACIÓN", rep)
-    d.metric("BAJA", baja)
+    a.metric("Total", r["total"])
+    b.metric("ACTIVO", r["activo"])
+    c.metric("REPARACIÓN", r["reparacion"])
+    d.metric("BAJA", r["baja"])
 
     st.markdown("### ⚠️ Alertas")
 
-    sin_resp = qone(
-        f"""
-        SELECT COUNT(*) as n FROM activos a
-        {where} {" AND " if where else " WHERE "}
-        a.responsable_id IS NULL
-        """,
-        params,
-    )["n"]
-
-    sin_ubi = qone(
-        f"""
-        SELECT COUNT(*) as n FROM activos a
-        {where} {" AND " if where else " WHERE "}
-        a.ubicacion_id IS NULL
-        """,
-        params,
-    )["n"]
-
-    en_rep = qone(
-        f"""
-        SELECT COUNT(*) as n FROM activos a
-        {where} {" AND " if where else " WHERE "}
-        a.estado='REPARACION'
-        """,
-        params,
-    )["n"]
-
-    sin_cat = qone(
-        f"""
-        SELECT COUNT(*) as n FROM activos a
-        {where} {" AND " if where else " WHERE "}
-        a.categoria_id IS NULL
-        """,
-        params,
-    )["n"]
+    sin_resp = r["sin_responsable"]
+    sin_ubi = r["sin_ubicacion"]
+    en_rep = r["reparacion"]
+    sin_cat = r["sin_categoria"]
 
     c1, c2 = st.columns(2)
     c1.warning(f"Activos sin responsable: {sin_resp}")
@@ -149,12 +119,13 @@ def dashboard():
 # ======================
 # Registrar activo
 # ======================
+@perfil.perfilado("registrar_activo")
 def registrar_activo():
     user = st.session_state["user"]
 
     # Comité del activo
     if user["rol"] == "ADMIN":
-        comites = qall("SELECT id, nombre FROM comites ORDER BY nombre")
+        comites = activos.listar_comites()
         comite_nombre = st.selectbox(
             "Comité del activo",
             [c["nombre"] for c in comites],
@@ -165,8 +136,17 @@ def registrar_activo():
         comite_id = user["comite_id"]
         st.info(f"Este activo se registrará en tu comité: **{user.get('comite_nombre','(sin nombre)')}**")
 
+    serie = serie_comite(comite_id)
+    if es_admin():
+        panel_serie(comite_id, serie)
+
     with st.form("reg_activo", clear_on_submit=True):
-        codigo = st.text_input("Código (opcional)", key="ra_codigo")
+        auto = False
+        if serie:
+            auto = st.checkbox(
+                f"Código automático ({serie['prefijo']}…)", value=True, key="ra_codigo_auto"
+            )
+        codigo = st.text_input("Código (opcional; se ignora si es automático)", key="ra_codigo")
         nombre = st.text_input("Nombre del activo", key="ra_nombre")
         descripcion = st.text_area("Descripción", height=80, key="ra_descripcion")
 
@@ -190,24 +170,16 @@ def registrar_activo():
 
         # ⚠️ Por ahora NO usamos IDs (empresa no ha definido catálogos)
         try:
-            exec_sql(
-                """
-                INSERT INTO activos(
-                    codigo, nombre, descripcion, estado,
-                    fecha_registro,
-                    categoria_id, ubicacion_id, responsable_id, comite_id
-                )
-                VALUES (%s,%s,%s,%s, NOW(), NULL, NULL, NULL, %s)
-                """,
-                (
-                    codigo_norm,
-                    nombre.strip(),
-                    descripcion.strip(),
-                    estado,
-                    comite_id,
-                ),
-            )
-            st.success("Activo registrado ✅")
+            if auto:
+                # código reservado en la base: no hay choque de UNIQUE que reintentar
+                reservados = reservar_codigos(comite_id, 1)
+                if not reservados:
+                    st.error("El comité ya no tiene prefijo configurado: escribe el código o déjalo vacío.")
+                    return
+                codigo_norm = reservados[0]
+
+            activos.registrar(comite_id, codigo_norm, nombre.strip(), descripcion.strip(), estado)
+            st.success(f"Activo registrado ✅ (código: {codigo_norm or 'sin código'})")
 
         except Exception as e:
             msg = str(e).lower()
@@ -217,72 +189,183 @@ def registrar_activo():
             else:
                 st.error(f"Error al guardar: {e}")
 
+    # 📥 Importación masiva: los códigos faltantes se reservan en un solo bloque
+    st.divider()
+    with st.expander("📥 Importar activos (CSV)"):
+        st.caption("Columnas: nombre (obligatoria), descripcion, estado, codigo (vacío = automático).")
+        archivo_csv = st.file_uploader("Archivo CSV", type=["csv"], key="ra_csv")
+        if archivo_csv is not None and st.button("Importar", key="btn_importar"):
+            try:
+                filas = pd.read_csv(archivo_csv, dtype=str).fillna("").to_dict("records")
+                ok_imp, msg = importar_activos(comite_id, filas, detalle="Importación CSV")
+                if ok_imp:
+                    st.success(msg)
+                else:
+                    st.error(msg)
+            except Exception as e:
+                msg = str(e).lower()
+                if "unique" in msg and "codigo" in msg:
+                    st.error("Algún código del archivo ya existe. No se importó nada.")
+                else:
+                    st.error(f"Error al importar: {e}")
+
+
+def panel_serie(comite_id, serie):
+    """
+    ADMIN: prefijo de códigos automáticos del comité elegido.
+    """
+    with st.expander("🔢 Códigos automáticos del comité"):
+        if serie:
+            st.caption(
+                f"Siguiente código: **{formatear(serie['prefijo'], serie['ancho'], serie['siguiente'])}**"
+            )
+        c1, c2 = st.columns([3, 1])
+        prefijo = c1.text_input(
+            "Prefijo (ej. CI-)", value=serie["prefijo"] if serie else "", key=f"serie_prefijo_{comite_id}"
+        )
+        ancho = c2.number_input(
+            "Dígitos", min_value=1, max_value=12, value=int(serie["ancho"]) if serie else 5,
+            key=f"serie_ancho_{comite_id}",
+        )
+        if st.button("Guardar prefijo", key="btn_serie"):
+            ok_serie, msg = configurar_serie(comite_id, prefijo, ancho)
+            if ok_serie:
+                st.success(msg)
+                st.rerun()
+            else:
+                st.error(msg)
+
+
+# ======================
+# Filtros del listado
+# ======================
+FACETAS_UI = {
+    "estado": ("Estado", "fl_estados"),
+    "categoria": ("Categoría", "fl_categorias"),
+    "ubicacion": ("Ubicación", "fl_ubicaciones"),
+    "responsable": ("Responsable", "fl_responsables"),
+}
+
+
+def panel_filtros(comite_id):
+    """
+    Arma el FiltroActivos con lo que ya está en session_state
+    (los multiselect se pintan después, con los conteos de la misma consulta).
+    Retorna (filtro, limite, offset)
+    """
+    ss = st.session_state
+
+    c1, c2, c3 = st.columns([3, 1, 1])
+    texto = c1.text_input("Buscar (código o nombre)", key="fl_texto")
+    desde = c2.date_input("Registrado desde", value=None, key="fl_desde")
+    hasta = c3.date_input("Registrado hasta", value=None, key="fl_hasta")
+
+    p1, p2, p3 = st.columns([2, 2, 1])
+    limite = p1.selectbox("Filas por página", [50, 100, 250, 500], index=1, key="fl_limite")
+    # el archivo solo se consulta si se pide
+    archivados = p3.toggle("Incluir archivados", key="fl_archivados")
+
+    # si cambió algún filtro se vuelve a la página 1 (antes de pintar el number_input)
+    firma = (
+        comite_id, texto, desde, hasta, limite, archivados,
+        *(tuple(ss.get(key, [])) for _, key in FACETAS_UI.values()),
+    )
+    if ss.get("fl_firma") != firma:
+        ss["fl_firma"] = firma
+        ss["fl_pagina"] = 1
+    pagina = p2.number_input("Página", min_value=1, step=1, key="fl_pagina")
+
+    filtro = FiltroActivos(
+        comite_id=comite_id,
+        estados=tuple(ss.get("fl_estados", [])),
+        categorias=tuple(ss.get("fl_categorias", [])),
+        ubicaciones=tuple(ss.get("fl_ubicaciones", [])),
+        responsables=tuple(ss.get("fl_responsables", [])),
+        desde=desde,
+        hasta=hasta,
+        texto=texto,
+        incluir_archivados=archivados,
+    )
+    return filtro, limite, (int(pagina) - 1) * int(limite)
+
+
+def panel_facetas(facetas):
+    """
+    Multiselect por faceta con el conteo en vivo de cada opción.
+    """
+    etiquetas = st.session_state.setdefault("fl_etiquetas", {})
+
+    with st.expander("🔎 Filtros", expanded=False):
+        cols = st.columns(len(FACETAS_UI))
+        for col, (faceta, (titulo, key)) in zip(cols, FACETAS_UI.items()):
+            conteo = {}
+            for f in facetas[faceta]:
+                conteo[f["valor"]] = f["n"]
+                etiquetas[(faceta, f["valor"])] = f["etiqueta"]
+
+            # lo ya seleccionado sigue como opción aunque hoy tenga 0
+            opciones = list(conteo) + [v for v in st.session_state.get(key, []) if v not in conteo]
+
+            col.multiselect(
+                titulo,
+                opciones,
+                key=key,
+                format_func=lambda v, f=faceta, c=conteo: (
+                    f"{etiquetas.get((f, v), v)} ({c.get(v, 0)})"
+                ),
+            )
+
 
 # ======================
 # Listado de activos
 # ======================
+@perfil.perfilado("listado_activos")
 def listado_activos():
     st.subheader("📋 Listado de activos")
 
     where, params, label = comite_scope()
     st.caption(f"Vista: **{label}**")
 
-    q = st.text_input("Buscar (código o nombre)")
-    extra_where = ""
-    extra_params = ()
-
-    if q.strip():
-        extra_where = (" AND " if where else " WHERE ") + "(a.codigo LIKE %s OR a.nombre LIKE %s)"
-        like = f"%{q.strip()}%"
-        extra_params = (like, like)
-
-    rows = qall(
-        f"""
-        SELECT
-          a.id, a.codigo, a.nombre, a.estado, a.fecha_registro,
-          c.nombre as categoria,
-          u.nombre as ubicacion,
-          r.nombre as responsable,
-          co.nombre as comite
-        FROM activos a
-        LEFT JOIN categorias c ON c.id = a.categoria_id
-        LEFT JOIN ubicaciones u ON u.id = a.ubicacion_id
-        LEFT JOIN responsables r ON r.id = a.responsable_id
-        JOIN comites co ON co.id = a.comite_id
-        {where}
-        {extra_where}
-        ORDER BY a.id DESC
-        """,
-        params + extra_params,
-    )
+    filtro, limite, offset = panel_filtros(params[0] if params else None)
+    res = consultar_listado(filtro, limite, offset)
+    panel_facetas(res["facetas"])
 
-    df = pd.DataFrame(rows)
+    st.caption(f"{res['total']} activo(s) con los filtros actuales")
+
+    with perfil.seccion("listado_activos.dataframe"):
+        df = pd.DataFrame(res["filas"])
     if df.empty:
-        st.info("No hay activos para mostrar.")
+        if res["total"]:
+            st.info("No hay activos en esta página: vuelve a la página 1.")
+        else:
+            st.info("No hay activos para mostrar.")
         return
 
     # ✅ ADMIN: tabla bonita + eliminar por fila (checkbox)
     if es_admin():
-        view = df.copy()
-        if "Eliminar" not in view.columns:
-            view["Eliminar"] = False
-
-        edited = st.data_editor(
-            view,
-            use_container_width=True,
-            hide_index=True,
-            column_config={
-                "Eliminar": st.column_config.CheckboxColumn("🗑️ Eliminar", help="Marca para eliminar"),
-                "id": st.column_config.NumberColumn("ID", width="small"),
-                "codigo": st.column_config.TextColumn("Código", width="medium"),
-                "nombre": st.column_config.TextColumn("Nombre", width="large"),
-                "estado": st.column_config.TextColumn("Estado", width="small"),
-                "fecha_registro": st.column_config.TextColumn("Registro", width="medium"),
-                "comite": st.column_config.TextColumn("Comité", width="medium"),
-            },
-            disabled=[c for c in view.columns if c != "Eliminar"],
-            key="activos_editor",
-        )
+        with perfil.seccion("listado_activos.copy"):
+            view = df.copy()
+            if "Eliminar" not in view.columns:
+                view["Eliminar"] = False
+
+        with perfil.render():
+            edited = st.data_editor(
+                view,
+                use_container_width=True,
+                hide_index=True,
+                column_config={
+                    "Eliminar": st.column_config.CheckboxColumn("🗑️ Eliminar", help="Marca para eliminar"),
+                    "id": st.column_config.NumberColumn("ID", width="small"),
+                    "codigo": st.column_config.TextColumn("Código", width="medium"),
+                    "nombre": st.column_config.TextColumn("Nombre", width="large"),
+                    "estado": st.column_config.TextColumn("Estado", width="small"),
+                    "fecha_registro": st.column_config.TextColumn("Registro", width="medium"),
+                    "comite": st.column_config.TextColumn("Comité", width="medium"),
+                    "archivado": st.column_config.CheckboxColumn("Archivado", width="small"),
+                },
+                disabled=[c for c in view.columns if c != "Eliminar"],
+                key="activos_editor",
+            )
 
         ids = edited.loc[edited["Eliminar"] == True, "id"].tolist()
 
@@ -294,12 +377,16 @@ def listado_activos():
             c1, c2 = st.columns(2)
             if c1.button("✅ Eliminar seleccionados", key="btn_del_sel"):
                 try:
+                    rechazados = []
                     for aid in ids:
-                        # si hay movimientos, borrarlos antes (por orden y por seguridad)
-                        exec_sql("DELETE FROM movimientos WHERE activo_id=%s", (int(aid),))
-                        exec_sql("DELETE FROM activos WHERE id=%s", (int(aid),))
-                    st.success("Eliminados ✅")
-                    st.rerun()
+                        ok_del, msg = activos.eliminar(int(aid))
+                        if not ok_del:
+                            rechazados.append(msg)
+                    if rechazados:
+                        st.error("No se eliminaron:\n- " + "\n- ".join(rechazados))
+                    else:
+                        st.success("Eliminados ✅")
+                        st.rerun()
                 except Exception as e:
                     st.error(f"No se pudo eliminar: {e}")
 
@@ -308,7 +395,8 @@ def listado_activos():
 
     # ✅ OPERADOR: tabla normal (bonita)
     else:
-        st.dataframe(df, use_container_width=True)
+        with perfil.render():
+            st.dataframe(df, use_container_width=True)
 
     # ⚠️ NO TOCAR: Dar de baja (rápido)
     st.divider()
@@ -316,28 +404,211 @@ def listado_activos():
     aid = st.number_input("ID del activo", min_value=1, step=1, key="baja_activo_id")
 
     if st.button("Marcar como BAJA", key="btn_baja"):
-        exec_sql("UPDATE activos SET estado='BAJA' WHERE id=%s", (int(aid),))
-
-        # ✅ Tu schema real tiene: (activo_id, fecha, tipo, detalle)
-        exec_sql(
-            """
-            INSERT INTO movimientos(activo_id, tipo, detalle, fecha)
-            VALUES (%s, %s, %s, NOW())
-            """,
-            (
-                int(aid),
-                "CAMBIO_ESTADO",
-                "Marcado como BAJA desde listado",
-            ),
+        ok_baja, msg = activos.dar_de_baja(int(aid))
+        if ok_baja:
+            st.success(msg)
+            st.rerun()
+        else:
+            st.error(msg)
+
+    # ✅ ADMIN: sacar de la tabla caliente las BAJA antiguas
+    if es_admin():
+        st.divider()
+        st.markdown("### 🗄️ Archivar activos en BAJA")
+        st.caption(
+            "Mueve al archivo los activos en BAJA (con sus movimientos) sin novedades "
+            "en los últimos N días. Se consultan con \"Incluir archivados\"."
+        )
+        dias = st.number_input("Días en BAJA", min_value=0, step=30, value=DIAS_BAJA, key="arch_dias")
+        if st.button("Archivar", key="btn_archivar"):
+            try:
+                n = archivar_bajas(int(dias))
+                st.success(f"Archivados: {n} ✅")
+            except Exception as e:
+                st.error(f"No se pudo archivar: {e}")
+
+
+# ======================
+# Inventario a la fecha
+# ======================
+@perfil.perfilado("inventario_fecha")
+def inventario_fecha():
+    st.subheader("🗓️ Inventario a la fecha")
+
+    user = st.session_state["user"]
+    comites = activos.listar_comites()
+    id2name = {c["id"]: c["nombre"] for c in comites}
+
+    if user["rol"] == "ADMIN":
+        cid = st.selectbox(
+            "Comité",
+            [0] + [c["id"] for c in comites],
+            format_func=lambda x: "Todos" if x == 0 else id2name.get(x, "Desconocido"),
+            key="inv_comite_id",
+        )
+    else:
+        cid = user["comite_id"]
+        st.caption(f"Comité: **{user.get('comite_nombre') or id2name.get(cid, 'Mi comité')}**")
+
+    c1, c2 = st.columns(2)
+    dia = c1.date_input("Fecha", key="inv_fecha")
+    hora = c2.time_input("Hora", value=time(23, 59, 59), key="inv_hora")
+    fecha = datetime.combine(dia, hora)
+
+    # la foto periódica la toma `python inventario.py` (cron), no esta página
+    filas, cp = inventario_a_la_fecha(fecha, cid or None)
+    if cp:
+        st.caption(f"Reconstruido desde el checkpoint del {cp['fecha']} + movimientos posteriores.")
+    else:
+        st.caption("Sin checkpoint anterior: reconstruido con toda la historia de movimientos.")
+
+    df = pd.DataFrame(filas)
+    if df.empty:
+        st.info("No había activos registrados a esa fecha.")
+        return
+
+    df["comite"] = df["comite_id"].map(id2name)
+    df = df.drop(columns=["comite_id"])
+
+    conteo = df["estado"].value_counts()
+    a, b, c, d = st.columns(4)
+    a.metric("Total", len(df))
+    b.metric("ACTIVO", int(conteo.get("ACTIVO", 0)))
+    c.metric("REPARACIÓN", int(conteo.get("REPARACION", 0)))
+    d.metric("BAJA", int(conteo.get("BAJA", 0)))
+
+    with perfil.render():
+        st.dataframe(df, use_container_width=True, hide_index=True)
+    st.download_button(
+        "⬇️ Descargar CSV",
+        df.to_csv(index=False).encode("utf-8"),
+        file_name=f"inventario_{fecha:%Y%m%d_%H%M}.csv",
+        mime="text/csv",
+    )
+
+    if es_admin() and st.button("📸 Tomar checkpoint ahora", key="btn_checkpoint"):
+        cp = crear_checkpoint()
+        st.success(f"Checkpoint {cp['id']} creado ✅")
+
+
+# ======================
+# Admin: Duplicados
+# ======================
+@perfil.perfilado("admin_duplicados")
+def admin_duplicados():
+    st.subheader("🧬 Posibles duplicados")
+    st.caption(
+        "Compara solo activos nuevos o modificados contra los que comparten "
+        "palabras del nombre o código."
+    )
+
+    if st.button("🔄 Buscar duplicados", key="btn_dup_buscar"):
+        try:
+            procesados, pares = duplicados.buscar_duplicados()
+            st.success(f"Activos revisados: {procesados} | Pares nuevos/actualizados: {pares} ✅")
+        except Exception as e:
+            st.error(f"No se pudo ejecutar la búsqueda: {e}")
+
+    rows = duplicados.pendientes()
+
+    df = pd.DataFrame(rows)
+    if df.empty:
+        st.info("No hay pares pendientes de revisión.")
+        return
+
+    view = df.copy()
+    view["No es duplicado"] = False
+    view["Confirmar"] = False
+
+    with perfil.render():
+        edited = st.data_editor(
+            view,
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                "activo_a": st.column_config.NumberColumn("ID A", width="small"),
+                "activo_b": st.column_config.NumberColumn("ID B", width="small"),
+                "puntaje": st.column_config.ProgressColumn("Similitud", min_value=0, max_value=1),
+                "No es duplicado": st.column_config.CheckboxColumn("❌ No es duplicado"),
+                "Confirmar": st.column_config.CheckboxColumn("✅ Duplicado"),
+            },
+            disabled=[c for c in view.columns if c not in ("No es duplicado", "Confirmar")],
+            key="duplicados_editor",
         )
 
-        st.success("Listo ✅")
+    descartar = edited.loc[edited["No es duplicado"] == True, ["activo_a", "activo_b"]].values.tolist()
+    confirmar = edited.loc[edited["Confirmar"] == True, ["activo_a", "activo_b"]].values.tolist()
+
+    if (descartar or confirmar) and st.button("💾 Guardar revisión", key="btn_dup_guardar"):
+        for estado, pares in (("DESCARTADO", descartar), ("CONFIRMADO", confirmar)):
+            duplicados.marcar(estado, pares)
+        st.success("Revisión guardada ✅ (los confirmados se dan de BAJA o se eliminan desde el listado)")
         st.rerun()
 
 
+# ======================
+# Admin: Analítica (snapshot local, no toca la base)
+# ======================
+@perfil.perfilado("admin_analitica")
+def admin_analitica():
+    st.subheader("📈 Analítica")
+
+    estado = analitica.leer_estado()
+    st.caption(
+        f"Snapshot: lote {estado['lote']} | actualizado: {estado['actualizado'] or 'nunca'}. "
+        "Los reportes corren sobre archivos Parquet locales."
+    )
+
+    if st.button("🔄 Actualizar snapshot", key="btn_snapshot"):
+        try:
+            estado = analitica.exportar_snapshot()
+            st.success(f"Snapshot actualizado (lote {estado['lote']}) ✅")
+        except Exception as e:
+            st.error(f"No se pudo exportar: {e}")
+
+    try:
+        con = analitica.conectar()
+    except Exception as e:
+        st.info(str(e))
+        return
+
+    try:
+        st.markdown("### Comité × categoría × estado")
+        cruce = analitica.cruce_comite_categoria_estado(con)
+        tabla = cruce.pivot_table(
+            index=["comite", "categoria"], columns="estado", values="total", fill_value=0
+        )
+        with perfil.render():
+            st.dataframe(tabla, use_container_width=True)
+        st.download_button(
+            "⬇️ CSV", cruce.to_csv(index=False).encode("utf-8"),
+            file_name="cruce_comite_categoria_estado.csv", mime="text/csv",
+        )
+
+        st.markdown("### Movimientos en el tiempo")
+        periodo = st.selectbox(
+            "Periodo", ["month", "quarter", "year"],
+            format_func={"month": "Mes", "quarter": "Trimestre", "year": "Año"}.get,
+            key="an_periodo",
+        )
+        movs = analitica.movimientos_por_periodo(con, periodo)
+        if movs.empty:
+            st.info("Sin movimientos en el snapshot.")
+        else:
+            with perfil.render():
+                st.bar_chart(movs, x="periodo", y="total", color="tipo")
+            st.download_button(
+                "⬇️ CSV", movs.to_csv(index=False).encode("utf-8"),
+                file_name="movimientos_por_periodo.csv", mime="text/csv",
+            )
+    finally:
+        con.close()
+
+
 # ======================
 # Admin: Usuarios
 # ======================
+@perfil.perfilado("admin_usuarios")
 def admin_usuarios():
     user = st.session_state["user"]
 
@@ -346,7 +617,7 @@ def admin_usuarios():
     # ======================
     # Crear usuario (igual que antes)
     # ======================
-    comites = qall("SELECT id, nombre FROM comites ORDER BY nombre")
+    comites = activos.listar_comites()
 
     with st.form("crear_usuario"):
         nombre = st.text_input("Nombre")
@@ -384,22 +655,10 @@ def admin_usuarios():
     st.divider()
     st.markdown("### 📜 Usuarios existentes")
 
-    rows = qall(
-        """
-        SELECT
-            u.id,
-            u.nombre,
-            u.usuario,
-            u.rol,
-            u.activo,
-            c.nombre AS comite
-        FROM usuarios u
-        LEFT JOIN comites c ON c.id = u.comite_id
-        ORDER BY u.id DESC
-        """
-    )
+    rows = listar_usuarios()
 
-    df = pd.DataFrame(rows)
+    with perfil.seccion("admin_usuarios.dataframe"):
+        df = pd.DataFrame(rows)
     if df.empty:
         st.info("No hay usuarios registrados.")
         return
@@ -408,25 +667,27 @@ def admin_usuarios():
     # ADMIN: tabla bonita + eliminar
     # ======================
     if es_admin():
-        view = df.copy()
-        view["Eliminar"] = False
+        with perfil.seccion("admin_usuarios.copy"):
+            view = df.copy()
+            view["Eliminar"] = False
 
-        edited = st.data_editor(
-            view,
-            use_container_width=True,
-            hide_index=True,
-            column_config={
-                "Eliminar": st.column_config.CheckboxColumn("🗑️ Eliminar"),
-                "id": st.column_config.NumberColumn("ID", width="small"),
-                "nombre": st.column_config.TextColumn("Nombre"),
-                "usuario": st.column_config.TextColumn("Usuario"),
-                "rol": st.column_config.TextColumn("Rol"),
-                "activo": st.column_config.NumberColumn("Activo"),
-                "comite": st.column_config.TextColumn("Comité"),
-            },
-            disabled=[c for c in view.columns if c != "Eliminar"],
-            key="usuarios_editor",
-        )
+        with perfil.render():
+            edited = st.data_editor(
+                view,
+                use_container_width=True,
+                hide_index=True,
+                column_config={
+                    "Eliminar": st.column_config.CheckboxColumn("🗑️ Eliminar"),
+                    "id": st.column_config.NumberColumn("ID", width="small"),
+                    "nombre": st.column_config.TextColumn("Nombre"),
+                    "usuario": st.column_config.TextColumn("Usuario"),
+                    "rol": st.column_config.TextColumn("Rol"),
+                    "activo": st.column_config.NumberColumn("Activo"),
+                    "comite": st.column_config.TextColumn("Comité"),
+                },
+                disabled=[c for c in view.columns if c != "Eliminar"],
+                key="usuarios_editor",
+            )
 
         ids = edited.loc[edited["Eliminar"] == True, "id"].tolist()
 
@@ -434,15 +695,16 @@ def admin_usuarios():
         ids_seguro = []
         bloqueados = []
 
-        for uid in ids:
-            row = df[df["id"] == uid].iloc[0]
+        with perfil.seccion("admin_usuarios.reglas"):
+            for uid in ids:
+                row = df[df["id"] == uid].iloc[0]
 
-            if int(uid) == int(user["id"]):
-                bloqueados.append(f"{row['usuario']} (sesión actual)")
-            elif row["rol"] == "ADMIN":
-                bloqueados.append(f"{row['usuario']} (ADMIN)")
-            else:
-                ids_seguro.append(uid)
+                if int(uid) == int(user["id"]):
+                    bloqueados.append(f"{row['usuario']} (sesión actual)")
+                elif row["rol"] == "ADMIN":
+                    bloqueados.append(f"{row['usuario']} (ADMIN)")
+                else:
+                    ids_seguro.append(uid)
 
         if bloqueados:
             st.warning("No se pueden eliminar estos usuarios:\n- " + "\n- ".join(bloqueados))
@@ -456,8 +718,7 @@ def admin_usuarios():
             c1, c2 = st.columns(2)
             if c1.button("✅ Eliminar seleccionados"):
                 try:
-                    for uid in ids_seguro:
-                        exec_sql("DELETE FROM usuarios WHERE id=%s", (int(uid),))
+                    eliminar_usuarios(ids_seguro)
                     st.success("Usuarios eliminados ✅")
                     st.rerun()
                 except Exception as e:
@@ -470,12 +731,14 @@ def admin_usuarios():
     # OPERADOR: solo ver
     # ======================
     else:
-        st.dataframe(df, use_container_width=True)
+        with perfil.render():
+            st.dataframe(df, use_container_width=True)
 
 
 # ======================
 # App principal
 # ======================
+@perfil.perfilado("main_app")
 def main_app():
     user = st.session_state["user"]
 
@@ -484,12 +747,15 @@ def main_app():
     if user.get("comite_nombre"):
         st.sidebar.caption(f"🏛️ Comité: {user['comite_nombre']}")
 
-    opciones = ["Panel", "Registrar activo", "Listado de activos", "Usuarios"]
+    opciones = ["Panel", "Registrar activo", "Listado de activos", "Inventario a la fecha", "Usuarios"]
+    if user["rol"] == "ADMIN":
+        opciones.insert(-1, "Duplicados")
+        opciones.insert(-1, "Analítica")
     menu = st.sidebar.radio("Ir a:", opciones, index=0)
 
     # ✅ Mostrar filtro de comité SOLO en "Listado de activos" (solo ADMIN)
     if user["rol"] == "ADMIN" and menu == "Listado de activos":
-        comites = qall("SELECT id, nombre FROM comites ORDER BY nombre")
+        comites = activos.listar_comites()
         id2name = {c["id"]: c["nombre"] for c in comites}
 
         # migración por si quedó algo viejo
@@ -513,6 +779,9 @@ def main_app():
         if user["rol"] == "ADMIN":
             st.session_state["vista_comite_id"] = 0
 
+    if user["rol"] == "ADMIN":
+        panel_perfil()
+
     if st.sidebar.button("Cerrar sesión"):
         st.session_state.pop("user", None)
         st.rerun()
@@ -521,6 +790,9 @@ def main_app():
         "Panel": "📊 Panel de control",
         "Registrar activo": "📝 Registrar activo",
         "Listado de activos": "📋 Listado de activos",
+        "Inventario a la fecha": "🗓️ Inventario a la fecha",
+        "Duplicados": "🧬 Duplicados",
+        "Analítica": "📈 Analítica",
         "Usuarios": "👥 Usuarios",
     }
     set_title(TITULOS.get(menu, "RAP Amazonía - Gestión de Activos"))
@@ -531,20 +803,69 @@ def main_app():
         registrar_activo()
     elif menu == "Listado de activos":
         listado_activos()
+    elif menu == "Inventario a la fecha":
+        inventario_fecha()
+    elif menu == "Duplicados":
+        admin_duplicados()
+    elif menu == "Analítica":
+        admin_analitica()
     else:
         admin_usuarios()
 
 
-def boot():
-    if "db_inited" not in st.session_state:
-        init_db()
-        st.session_state["db_inited"] = True
+# ======================
+# Perfil de reruns (ADMIN)
+# ======================
+def panel_perfil():
+    with st.sidebar.expander("⏱️ Perfil de reruns"):
+        st.toggle("Perfilar reruns", key="perfil_on")
+        st.toggle("Muestrear pilas", key="perfil_muestreo", help="Más costoso; para flamegraph")
+
+        buffer = st.session_state.get("_perfil_buffer")
+        if not buffer:
+            st.caption("Sin reruns perfilados todavía.")
+            return
 
-    if "user" not in st.session_state or not st.session_state["user"]:
-        set_title("🔐 Ingreso - Gestión de Activos (RAP Amazonía)")
-        pantalla_login()
-    else:
-        main_app()
+        tabla = pd.DataFrame(
+            [
+                {
+                    "inicio": r["inicio"],
+                    "total_ms": round(r["total_s"] * 1000, 1),
+                    "db_ms": round(r["db_s"] * 1000, 1),
+                    "render_ms": round(r["render_s"] * 1000, 1),
+                    "python_ms": round(r["python_s"] * 1000, 1),
+                    "consultas": r["db_consultas"],
+                }
+                for r in reversed(buffer)
+            ]
+        )
+        st.dataframe(tabla, hide_index=True)
+        st.download_button(
+            "⬇️ Descargar (JSON)",
+            json.dumps(list(buffer), ensure_ascii=False, indent=2),
+            file_name="perfil_reruns.json",
+            mime="application/json",
+        )
+        if st.button("Vaciar", key="btn_perfil_vaciar"):
+            buffer.clear()
+
+
+def boot():
+    buffer = None
+    if st.session_state.get("perfil_on"):
+        buffer = st.session_state.setdefault("_perfil_buffer", deque(maxlen=perfil.MAX_RERUNS))
+
+    with perfil.rerun(buffer, muestreo=st.session_state.get("perfil_muestreo", False)):
+        with perfil.seccion("boot"):
+            if "db_inited" not in st.session_state:
+                init_db()
+                st.session_state["db_inited"] = True
+
+            if "user" not in st.session_state or not st.session_state["user"]:
+                set_title("🔐 Ingreso - Gestión de Activos (RAP Amazonía)")
+                pantalla_login()
+            else:
+                main_app()
 
 
 if __name__ == "__main__":
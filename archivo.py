@@ -0,0 +1,91 @@
+import os
+import sys
+from datetime import datetime, timedelta
+
+from db import DB_BACKEND, get_conn
+
+# Días que debe llevar un activo en BAJA antes de salir de la tabla caliente
+DIAS_BAJA = int(os.getenv("ARCHIVO_DIAS_BAJA", "365"))
+# Activos por transacción (lotes cortos = bloqueos cortos)
+LOTE = int(os.getenv("ARCHIVO_LOTE", "500"))
+
+COLUMNAS_ACTIVO = (
+    "id, codigo, nombre, descripcion, estado, fecha_registro, "
+    "categoria_id, ubicacion_id, responsable_id, comite_id"
+)
+COLUMNAS_MOVIMIENTO = "id, activo_id, fecha, tipo, detalle, estado_anterior, estado_nuevo"
+
+
+def archivar_bajas(dias: int = None, lote: int = None):
+    """
+    Mueve a activos_archivo/movimientos_archivo los activos en BAJA cuya
+    última novedad (último movimiento o, si no hay, el registro) es más
+    vieja que `dias`. Cada lote va en su propia transacción.
+    Retorna cuántos activos se archivaron.
+    """
+    dias = DIAS_BAJA if dias is None else int(dias)
+    lote = LOTE if lote is None else int(lote)
+    corte = datetime.now() - timedelta(days=dias)
+
+    # Postgres: las filas elegidas quedan bloqueadas hasta el commit del lote
+    # (SQLite ya serializa las escrituras)
+    bloqueo = "FOR UPDATE OF a" if DB_BACKEND == "postgres" else ""
+
+    total = 0
+    conn = get_conn()
+    try:
+        while True:
+            with conn.cursor() as cur:
+                cur.execute(
+                    f"""
+                    SELECT a.id
+                    FROM activos a
+                    WHERE a.estado='BAJA'
+                      AND COALESCE(
+                        (SELECT MAX(m.fecha) FROM movimientos m WHERE m.activo_id = a.id),
+                        a.fecha_registro
+                      ) < %s
+                    ORDER BY a.id
+                    LIMIT %s
+                    {bloqueo}
+                    """,
+                    (corte, lote),
+                )
+                ids = [r["id"] for r in cur.fetchall()]
+                if not ids:
+                    break
+
+                # se repite estado='BAJA': si alguien lo reactivó entre el SELECT y
+                # el movimiento, se queda en la tabla caliente
+                ph = ",".join(["%s"] * len(ids))
+                siguen = f"SELECT id FROM activos WHERE id IN ({ph}) AND estado='BAJA'"
+                cur.execute(
+                    f"""
+                    INSERT INTO activos_archivo({COLUMNAS_ACTIVO})
+                    SELECT {COLUMNAS_ACTIVO} FROM activos WHERE id IN ({ph}) AND estado='BAJA'
+                    """,
+                    ids,
+                )
+                cur.execute(
+                    f"""
+                    INSERT INTO movimientos_archivo({COLUMNAS_MOVIMIENTO})
+                    SELECT {COLUMNAS_MOVIMIENTO} FROM movimientos WHERE activo_id IN ({siguen})
+                    """,
+                    ids,
+                )
+                cur.execute(f"DELETE FROM movimientos WHERE activo_id IN ({siguen})", ids)
+                cur.execute(f"DELETE FROM activos WHERE id IN ({ph}) AND estado='BAJA'", ids)
+                movidos = cur.rowcount
+
+            conn.commit()
+            total += movidos
+    finally:
+        conn.close()
+
+    return total
+
+
+if __name__ == "__main__":
+    dias = int(sys.argv[1]) if len(sys.argv) > 1 else None
+    n = archivar_bajas(dias)
+    print("ARCHIVADOS =", n)
@@ -65,3 +65,43 @@ def crear_usuario_admin(nombre: str, usuario: str, clave: str, rol: str, comite_
         return True, "Usuario creado ✅"
     finally:
         conn.close()
+
+
+def listar_usuarios():
+    conn = get_conn()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                SELECT
+                    u.id,
+                    u.nombre,
+                    u.usuario,
+                    u.rol,
+                    u.activo,
+                    c.nombre AS comite
+                FROM usuarios u
+                LEFT JOIN comites c ON c.id = u.comite_id
+                ORDER BY u.id DESC
+                """
+            )
+            return [dict(r) for r in cur.fetchall()]
+    finally:
+        conn.close()
+
+
+def eliminar_usuarios(ids):
+    """
+    Borra los usuarios en una transacción (la pantalla ya filtró los que no se pueden borrar).
+    """
+    conn = get_conn()
+    try:
+        with conn.cursor() as cur:
+            for uid in ids:
+                cur.execute("DELETE FROM usuarios WHERE id=%s", (int(uid),))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
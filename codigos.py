@@ -0,0 +1,211 @@
+import re
+
+from db import get_conn, qone
+
+# Reservas grandes se hacen igual en una sola sentencia; esto solo evita errores de tipeo
+MAX_RESERVA = 100000
+
+# El prefijo termina en algo que no sea dígito: así "A-" + 00012 nunca choca con otro prefijo
+_RE_PREFIJO = re.compile(r"^[A-Z0-9][A-Z0-9-]*[A-Z-]$|^[A-Z]$")
+
+
+def serie_comite(comite_id):
+    """
+    Serie de códigos del comité o None si no tiene códigos automáticos.
+    """
+    return qone(
+        "SELECT comite_id, prefijo, ancho, siguiente FROM codigo_series WHERE comite_id=%s",
+        (comite_id,),
+    )
+
+
+def formatear(prefijo: str, ancho: int, n: int) -> str:
+    return f"{prefijo}{n:0{ancho}d}"
+
+
+def configurar_serie(comite_id, prefijo: str, ancho: int = 5):
+    """
+    Crea/actualiza el prefijo del comité. El contador arranca después del
+    mayor código ya existente con ese prefijo (incluye el archivo).
+    Retorna (ok, msg) como crear_usuario_admin.
+    """
+    prefijo = (prefijo or "").strip().upper()
+    ancho = int(ancho)
+
+    if comite_id is None:
+        return False, "Falta el comité."
+    if not _RE_PREFIJO.match(prefijo):
+        return False, "Prefijo inválido: letras/números/guion y que no termine en número (ej. CI-)."
+    if not 1 <= ancho <= 12:
+        return False, "El ancho debe estar entre 1 y 12."
+
+    conn = get_conn()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(
+                "SELECT comite_id FROM codigo_series WHERE prefijo=%s AND comite_id<>%s",
+                (prefijo, comite_id),
+            )
+            if cur.fetchone():
+                return False, "Ese prefijo ya lo usa otro comité."
+
+            cur.execute(
+                """
+                SELECT codigo FROM activos WHERE codigo LIKE %s
+                UNION ALL
+                SELECT codigo FROM activos_archivo WHERE codigo LIKE %s
+                """,
+                (prefijo + "%", prefijo + "%"),
+            )
+            mayor = 0
+            for r in cur.fetchall():
+                resto = r["codigo"][len(prefijo):]
+                if resto.isdigit():
+                    mayor = max(mayor, int(resto))
+
+            cur.execute(
+                """
+                INSERT INTO codigo_series(comite_id, prefijo, ancho, siguiente)
+                VALUES (%s, %s, %s, %s)
+                ON CONFLICT (comite_id) DO UPDATE SET
+                  prefijo = EXCLUDED.prefijo,
+                  ancho = EXCLUDED.ancho,
+                  siguiente = CASE
+                    WHEN codigo_series.prefijo = EXCLUDED.prefijo
+                     AND codigo_series.siguiente > EXCLUDED.siguiente
+                    THEN codigo_series.siguiente
+                    ELSE EXCLUDED.siguiente
+                  END
+                """,
+                (comite_id, prefijo, ancho, mayor + 1),
+            )
+
+        conn.commit()
+        return True, f"Serie {prefijo} lista ✅"
+    finally:
+        conn.close()
+
+
+def reservar_codigos(comite_id, n: int = 1):
+    """
+    Reserva `n` códigos consecutivos del comité en una sola sentencia
+    (UPDATE ... RETURNING: atómico, sin reintentos por choque de UNIQUE).
+    Retorna la lista de códigos, o [] si el comité no tiene serie.
+    Los códigos reservados que no se usen quedan como huecos (igual que una secuencia).
+    """
+    n = int(n)
+    if n < 1:
+        return []
+    if n > MAX_RESERVA:
+        raise ValueError(f"No se pueden reservar más de {MAX_RESERVA} códigos a la vez.")
+
+    conn = get_conn()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                UPDATE codigo_series SET siguiente = siguiente + %s
+                WHERE comite_id=%s
+                RETURNING prefijo, ancho, siguiente - %s AS desde
+                """,
+                (n, comite_id, n),
+            )
+            row = cur.fetchone()
+        conn.commit()
+    finally:
+        conn.close()
+
+    if not row:
+        return []
+    return [formatear(row["prefijo"], row["ancho"], i) for i in range(row["desde"], row["desde"] + n)]
+
+
+def avanzar_series(cur, codigos):
+    """
+    Códigos escritos a mano que caen en una serie ("CI-00001" con prefijo CI-):
+    el contador de esa serie salta más allá, en la transacción del INSERT
+    (va antes que el INSERT: en Postgres deja tomada la fila de la serie).
+    Así una reserva posterior no choca con ellos.
+    """
+    codigos = [c for c in codigos if c]
+    if not codigos:
+        return
+
+    cur.execute("SELECT prefijo FROM codigo_series")
+    mayores = {}
+    for r in cur.fetchall():
+        prefijo = r["prefijo"]
+        for c in codigos:
+            resto = c[len(prefijo):]
+            if c.startswith(prefijo) and resto.isdigit():
+                mayores[prefijo] = max(mayores.get(prefijo, 0), int(resto))
+
+    for prefijo, mayor in mayores.items():
+        cur.execute(
+            "UPDATE codigo_series SET siguiente=%s WHERE prefijo=%s AND siguiente<=%s",
+            (mayor + 1, prefijo, mayor),
+        )
+
+
+def importar_activos(comite_id, filas, detalle: str = "Importación"):
+    """
+    Registra muchos activos en una transacción.
+    filas = [{"nombre", "descripcion", "estado", "codigo"(opcional)}]
+    Los que vienen sin código reciben uno de la serie, reservados en un solo bloque;
+    los que traen uno de la serie la hacen avanzar (avanzar_series).
+    Retorna (ok, msg).
+    """
+    limpias = []
+    for i, f in enumerate(filas, start=1):
+        nombre = str(f.get("nombre") or "").strip()
+        estado = str(f.get("estado") or "ACTIVO").strip().upper()
+        codigo = str(f.get("codigo") or "").strip() or None
+        if not nombre:
+            return False, f"Fila {i}: el nombre es obligatorio."
+        if estado not in ("ACTIVO", "REPARACION", "BAJA"):
+            return False, f"Fila {i}: estado inválido ({estado})."
+        limpias.append([codigo, nombre, str(f.get("descripcion") or "").strip(), estado])
+
+    if not limpias:
+        return False, "No hay filas para importar."
+
+    manuales = [f[0] for f in limpias if f[0] is not None]
+    sin_codigo = [f for f in limpias if f[0] is None]
+    if sin_codigo:
+        codigos = reservar_codigos(comite_id, len(sin_codigo))
+        if not codigos:
+            return False, "Hay filas sin código y el comité no tiene prefijo configurado."
+        for f, c in zip(sin_codigo, codigos):
+            f[0] = c
+
+    conn = get_conn()
+    try:
+        with conn.cursor() as cur:
+            avanzar_series(cur, manuales)
+            cur.executemany(
+                """
+                INSERT INTO activos(codigo, nombre, descripcion, estado, fecha_registro, comite_id)
+                VALUES (%s, %s, %s, %s, NOW(), %s)
+                """,
+                [f + [comite_id] for f in limpias],
+            )
+            # estado inicial para "Inventario a la fecha" (todos tienen código a esta altura)
+            todos = [f[0] for f in limpias]
+            for i in range(0, len(todos), 1000):
+                trozo = todos[i:i + 1000]
+                cur.execute(
+                    f"""
+                    INSERT INTO movimientos(activo_id, tipo, detalle, estado_nuevo, fecha)
+                    SELECT id, 'REGISTRO', %s, estado, NOW()
+                    FROM activos
+                    WHERE codigo IN ({','.join(['%s'] * len(trozo))})
+                    """,
+                    [detalle] + trozo,
+                )
+        conn.commit()
+        return True, f"Importados {len(limpias)} activo(s) ✅"
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
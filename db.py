@@ -1,15 +1,30 @@
+import hashlib
 import os
+import re
+import sqlite3
+from datetime import date, datetime
 from pathlib import Path
 
-import psycopg
-from psycopg.rows import dict_row
+from perfil import conexion
 
 # Solo para compatibilidad (tu ver_db.py imprime DB_PATH)
 BASE_DIR = Path(__file__).resolve().parent
 DATA_DIR = BASE_DIR / "data"
+SCHEMA_PATH = BASE_DIR / "schema.sql"
+SCHEMA_SQLITE_PATH = BASE_DIR / "schema_sqlite.sql"
+
+# Backend: "postgres" (Railway / servidor) o "sqlite" (archivo local, sedes sin red)
+DB_BACKEND = os.getenv("DB_BACKEND", "postgres").strip().lower()
+SQLITE_PATH = Path(os.getenv("SQLITE_PATH", str(DATA_DIR / "rap_activos.db")))
+
+if DB_BACKEND not in ("postgres", "sqlite"):
+    raise ValueError(f"DB_BACKEND debe ser 'postgres' o 'sqlite'. Valor recibido: {DB_BACKEND!r}")
 
 # REFERENCIA VISUAL (no se usa para conectar)
-DB_PATH = os.getenv("DATABASE_PUBLIC_URL", "manual-postgres")
+if DB_BACKEND == "sqlite":
+    DB_PATH = str(SQLITE_PATH)
+else:
+    DB_PATH = os.getenv("DATABASE_PUBLIC_URL", "manual-postgres")
 
 
 def _clean_url(url: str) -> str:
@@ -22,11 +37,25 @@ def _clean_url(url: str) -> str:
 
 
 def get_conn():
+    """
+    Conexión según DB_BACKEND. Ambas entregan filas tipo dict,
+    `with conn.cursor() as cur` y placeholders %s.
+    """
+    if DB_BACKEND == "sqlite":
+        return conexion(_get_conn_sqlite)
+    return conexion(_get_conn_postgres)
+
+
+def _get_conn_postgres():
     """
     MODO MANUAL ESTABLE (Railway):
     - Usa SOLO DATABASE_PUBLIC_URL (URL pública tipo postgresql://...)
     - Si no existe, fallback local (tu PC)
     """
+    # import aquí: las sedes con SQLite no necesitan psycopg instalado
+    import psycopg
+    from psycopg.rows import dict_row
+
     sslmode = os.getenv("PGSSLMODE", "require")
 
     # 1) URL pública (la tuya)
@@ -50,6 +79,136 @@ def get_conn():
     return psycopg.connect(local_dsn, row_factory=dict_row, sslmode=sslmode)
 
 
+# ======================
+# Backend SQLite
+# ======================
+# Fechas como texto ISO "YYYY-MM-DD HH:MM:SS" (ordenan igual que en Postgres)
+sqlite3.register_adapter(datetime, lambda d: d.isoformat(" "))
+sqlite3.register_adapter(date, lambda d: d.isoformat())
+sqlite3.register_converter("TIMESTAMP", lambda b: datetime.fromisoformat(b.decode()))
+
+_AHORA_SQLITE = "datetime('now','localtime')"
+
+_RE_AHORA = re.compile(r"\bNOW\(\)|\bCURRENT_TIMESTAMP\b", re.IGNORECASE)
+
+
+def _sql_sqlite(sql: str) -> str:
+    """
+    Traduce el SQL de la app (dialecto Postgres) a SQLite:
+    placeholders %s -> ? y NOW()/CURRENT_TIMESTAMP -> hora local.
+    """
+    return _RE_AHORA.sub(_AHORA_SQLITE, sql.replace("%s", "?"))
+
+
+def _schema_sqlite(sql: str) -> str:
+    """
+    Traduce el DDL de schema.sql a SQLite.
+    Los bloques "-- @solo-postgres" (PL/pgSQL) se quitan: su versión está en schema_sqlite.sql.
+    """
+    sql = re.sub(r"-- @solo-postgres\n.*?-- @fin-solo-postgres\n", "", sql, flags=re.DOTALL)
+    sql = re.sub(r"\bSERIAL PRIMARY KEY\b", "INTEGER PRIMARY KEY AUTOINCREMENT", sql)
+    sql = re.sub(r"\bDEFAULT CURRENT_TIMESTAMP\b", f"DEFAULT ({_AHORA_SQLITE})", sql)
+    # SQLite no tiene ADD COLUMN IF NOT EXISTS: se ignora "duplicate column" al aplicar
+    sql = re.sub(r"\bADD COLUMN IF NOT EXISTS\b", "ADD COLUMN", sql)
+    return sql
+
+
+class _SqliteCursor:
+    def __init__(self, cur):
+        self._cur = cur
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._cur.close()
+
+    def execute(self, sql: str, params=()):
+        self._cur.execute(_sql_sqlite(sql), tuple(params))
+        return self
+
+    def executemany(self, sql: str, seq):
+        self._cur.executemany(_sql_sqlite(sql), [tuple(p) for p in seq])
+        return self
+
+    def fetchone(self):
+        row = self._cur.fetchone()
+        return dict(row) if row else None
+
+    def fetchall(self):
+        return [dict(r) for r in self._cur.fetchall()]
+
+    @property
+    def rowcount(self):
+        return self._cur.rowcount
+
+
+class _SqliteConn:
+    """
+    Envoltorio mínimo para que sqlite3 se use igual que psycopg en la app.
+    """
+
+    def __init__(self, raw):
+        self._raw = raw
+
+    def cursor(self):
+        return _SqliteCursor(self._raw.cursor())
+
+    def execute(self, sql: str, params=()):
+        return self.cursor().execute(sql, params)
+
+    def commit(self):
+        self._raw.commit()
+
+    def rollback(self):
+        self._raw.rollback()
+
+    def close(self):
+        self._raw.close()
+
+
+def _get_conn_sqlite():
+    SQLITE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    raw = sqlite3.connect(SQLITE_PATH, timeout=30, detect_types=sqlite3.PARSE_DECLTYPES)
+    raw.row_factory = sqlite3.Row
+    # WAL: lectores no bloquean al escritor; NORMAL es seguro con WAL
+    raw.execute("PRAGMA journal_mode=WAL")
+    raw.execute("PRAGMA synchronous=NORMAL")
+    raw.execute("PRAGMA foreign_keys=ON")
+    # LIKE sensible a mayúsculas, como en Postgres
+    raw.execute("PRAGMA case_sensitive_like=ON")
+    return _SqliteConn(raw)
+
+
+def _crear_schema_sqlite(conn):
+    """
+    Aplica schema.sql traducido + schema_sqlite.sql, sentencia por sentencia.
+    Solo si cambiaron desde la última vez: la huella de los dos archivos queda
+    en PRAGMA user_version (cada sesión nueva de Streamlit llama a init_db).
+    """
+    raw = conn._raw
+    sql = _schema_sqlite(SCHEMA_PATH.read_text(encoding="utf-8"))
+    sql += "\n" + SCHEMA_SQLITE_PATH.read_text(encoding="utf-8")
+
+    version = int(hashlib.sha1(sql.encode("utf-8")).hexdigest()[:7], 16)
+    if raw.execute("PRAGMA user_version").fetchone()[0] == version:
+        return
+
+    pendiente = ""
+    for linea in sql.splitlines(keepends=True):
+        pendiente += linea
+        if not sqlite3.complete_statement(pendiente):
+            continue
+        try:
+            raw.execute(pendiente)
+        except sqlite3.OperationalError as e:
+            if "duplicate column name" not in str(e):
+                raise
+        pendiente = ""
+    raw.execute(f"PRAGMA user_version = {version}")
+    raw.commit()
+
+
 def qone(sql: str, params=()):
     conn = get_conn()
     try:
@@ -96,9 +255,13 @@ def init_db():
     """
     En Railway NO creamos tablas desde aquí.
     Solo hacemos SEED si las tablas ya existen.
+    Con SQLite (archivo local) sí se crea el schema: no hay DBA ni psql.
     """
     conn = get_conn()
     try:
+        if DB_BACKEND == "sqlite":
+            _crear_schema_sqlite(conn)
+
         with conn.cursor() as cur:
             # Si aún no existen tablas, esto fallará, y está bien.
             try:
@@ -0,0 +1,331 @@
+import hashlib
+import os
+import re
+import unicodedata
+from collections import defaultdict
+
+from db import get_conn
+
+# Puntaje mínimo (0..1) para proponer un par
+UMBRAL = float(os.getenv("DUPLICADOS_UMBRAL", "0.75"))
+# Bloques más grandes que esto ("silla", "mesa"...) no generan pares: no discriminan
+MAX_BLOQUE = int(os.getenv("DUPLICADOS_MAX_BLOQUE", "200"))
+# Activos procesados por transacción
+LOTE = int(os.getenv("DUPLICADOS_LOTE", "1000"))
+# Ids que se releen detrás de la marca de agua (SERIAL confirmados fuera de orden)
+VENTANA = int(os.getenv("DUPLICADOS_VENTANA", "100"))
+
+# Peso de cada campo en el puntaje (se re-normaliza si un campo falta)
+PESOS = {"nombre": 0.6, "codigo": 0.25, "descripcion": 0.15}
+
+STOPWORDS = {"de", "del", "la", "el", "los", "las", "con", "para", "por", "sin", "y", "en"}
+
+
+def normalizar(s: str) -> str:
+    """
+    minúsculas, sin tildes, "t-14" -> "t14", solo letras/números separados por un espacio.
+    """
+    s = (s or "").strip().lower()
+    s = "".join(
+        c for c in unicodedata.normalize("NFD", s)
+        if unicodedata.category(c) != "Mn"
+    )
+    s = re.sub(r"(?<=[a-z0-9])[-_./](?=[a-z0-9])", "", s)
+    s = re.sub(r"[^a-z0-9]+", " ", s)
+    return " ".join(s.split())
+
+
+def claves_bloqueo(activo) -> set:
+    """
+    Claves de bloqueo: tokens significativos del nombre y el código normalizado.
+    Dos activos solo se comparan si comparten al menos una clave.
+    """
+    claves = set()
+    for t in normalizar(activo["nombre"]).split():
+        if len(t) >= 3 and t not in STOPWORDS:
+            claves.add("t:" + t)
+    codigo = normalizar(activo["codigo"]).replace(" ", "")
+    if codigo:
+        claves.add("c:" + codigo)
+    return claves
+
+
+def firma(activo) -> str:
+    texto = "|".join(normalizar(activo[c]) for c in ("nombre", "codigo", "descripcion"))
+    return hashlib.sha1(texto.encode("utf-8")).hexdigest()
+
+
+def _trigramas(s: str) -> set:
+    s = f"  {s} "
+    return {s[i:i + 3] for i in range(len(s) - 2)}
+
+
+def similitud(a: str, b: str) -> float:
+    """
+    Jaccard de trigramas sobre el texto normalizado (0..1).
+    """
+    ta = _trigramas(normalizar(a))
+    tb = _trigramas(normalizar(b))
+    if not ta or not tb:
+        return 0.0
+    return len(ta & tb) / len(ta | tb)
+
+
+def _ponderado(x, y, campos) -> float:
+    total = 0.0
+    pesos = 0.0
+    for campo in campos:
+        if normalizar(x[campo]) and normalizar(y[campo]):
+            total += PESOS[campo] * similitud(x[campo], y[campo])
+            pesos += PESOS[campo]
+    return total / pesos if pesos else 0.0
+
+
+def puntaje(x, y) -> float:
+    """
+    Similitud ponderada de nombre/código/descripción.
+    El código solo suma: el mismo bien registrado dos veces suele traer códigos distintos.
+    """
+    con_codigo = _ponderado(x, y, ("nombre", "codigo", "descripcion"))
+    sin_codigo = _ponderado(x, y, ("nombre", "descripcion"))
+    return max(con_codigo, sin_codigo)
+
+
+def buscar_duplicados():
+    """
+    Job incremental:
+    1) candidatos a revisar por marca de agua: activos nuevos (id) o con
+       movimientos nuevos; de esos, solo los que cambiaron de firma
+    2) se reescriben sus claves de bloqueo (todos los lotes primero, así el
+       tamaño de cada bloque ya es el final al comparar)
+    3) se comparan contra los activos que comparten bloque (no todos contra todos)
+    4) los pares con puntaje >= UMBRAL quedan PENDIENTE para revisión
+    Las ediciones de nombre/código/descripción deben dejar un movimiento; para
+    releer todo basta vaciar duplicados_marcas.
+    Retorna (procesados, pares_propuestos).
+    """
+    conn = get_conn()
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT max_activo_id, max_movimiento_id FROM duplicados_marcas WHERE id=1")
+            marcas = cur.fetchone() or {"max_activo_id": 0, "max_movimiento_id": 0}
+            # se toman antes de leer: lo que entre durante la corrida queda para la próxima
+            cur.execute("SELECT COALESCE(MAX(id), 0) AS n FROM activos")
+            max_activo = cur.fetchone()["n"]
+            cur.execute("SELECT COALESCE(MAX(id), 0) AS n FROM movimientos")
+            max_movimiento = cur.fetchone()["n"]
+
+            # VENTANA: los SERIAL pueden confirmarse fuera de orden; lo releído
+            # sin cambios lo descarta la firma
+            cur.execute(
+                """
+                SELECT a.id, a.codigo, a.nombre, a.descripcion, f.firma
+                FROM activos a LEFT JOIN duplicados_firmas f ON f.activo_id = a.id
+                WHERE a.id > %s
+                UNION
+                SELECT a.id, a.codigo, a.nombre, a.descripcion, f.firma
+                FROM activos a LEFT JOIN duplicados_firmas f ON f.activo_id = a.id
+                WHERE a.id IN (SELECT activo_id FROM movimientos WHERE id > %s)
+                """,
+                (
+                    max(0, marcas["max_activo_id"] - VENTANA),
+                    max(0, marcas["max_movimiento_id"] - VENTANA),
+                ),
+            )
+            activos = {}
+            cambiados = []
+            for r in cur.fetchall():
+                f = firma(r)
+                if r["firma"] != f:
+                    activos[r["id"]] = r
+                    cambiados.append((r["id"], f))
+        cambiados.sort()
+
+        for i in range(0, len(cambiados), LOTE):
+            _indexar_lote(conn, activos, cambiados[i:i + LOTE])
+            conn.commit()
+
+        pares = 0
+        ids = [aid for aid, _ in cambiados]
+        for i in range(0, len(ids), LOTE):
+            pares += _comparar_lote(conn, activos, ids[i:i + LOTE])
+            conn.commit()
+
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                INSERT INTO duplicados_marcas(id, max_activo_id, max_movimiento_id)
+                VALUES (1, %s, %s)
+                ON CONFLICT (id) DO UPDATE SET
+                  max_activo_id = EXCLUDED.max_activo_id,
+                  max_movimiento_id = EXCLUDED.max_movimiento_id
+                """,
+                (max_activo, max_movimiento),
+            )
+        conn.commit()
+
+        return len(cambiados), pares
+    finally:
+        conn.close()
+
+
+def _indexar_lote(conn, activos, lote):
+    """
+    Claves de bloqueo + firma de los activos del lote; fuera sus pares pendientes viejos.
+    """
+    ids = [aid for aid, _ in lote]
+    ph = ",".join(["%s"] * len(ids))
+
+    with conn.cursor() as cur:
+        cur.execute(f"DELETE FROM duplicados_bloques WHERE activo_id IN ({ph})", ids)
+        cur.execute(
+            f"""
+            DELETE FROM duplicados_candidatos
+            WHERE estado='PENDIENTE' AND (activo_a IN ({ph}) OR activo_b IN ({ph}))
+            """,
+            ids + ids,
+        )
+        cur.executemany(
+            "INSERT INTO duplicados_bloques(clave, activo_id) VALUES (%s, %s)",
+            [(c, aid) for aid in ids for c in claves_bloqueo(activos[aid])],
+        )
+        cur.executemany(
+            """
+            INSERT INTO duplicados_firmas(activo_id, firma) VALUES (%s, %s)
+            ON CONFLICT (activo_id) DO UPDATE SET firma = EXCLUDED.firma
+            """,
+            lote,
+        )
+
+
+def _comparar_lote(conn, activos, ids):
+    """
+    Compara los activos del lote con los miembros de sus bloques
+    (los bloques de más de MAX_BLOQUE no discriminan y se saltan).
+    `activos` se completa con los miembros que haga falta leer.
+    """
+    claves = {aid: claves_bloqueo(activos[aid]) for aid in ids}
+    todas = sorted({c for cs in claves.values() for c in cs})
+    miembros = defaultdict(list)
+
+    with conn.cursor() as cur:
+        chicas = []
+        for i in range(0, len(todas), 1000):
+            trozo = todas[i:i + 1000]
+            cur.execute(
+                f"""
+                SELECT clave, COUNT(*) AS n FROM duplicados_bloques
+                WHERE clave IN ({','.join(['%s'] * len(trozo))})
+                GROUP BY clave
+                """,
+                trozo,
+            )
+            chicas += [r["clave"] for r in cur.fetchall() if 1 < r["n"] <= MAX_BLOQUE]
+
+        for i in range(0, len(chicas), 1000):
+            trozo = chicas[i:i + 1000]
+            cur.execute(
+                f"""
+                SELECT clave, activo_id FROM duplicados_bloques
+                WHERE clave IN ({','.join(['%s'] * len(trozo))})
+                """,
+                trozo,
+            )
+            for r in cur.fetchall():
+                miembros[r["clave"]].append(r["activo_id"])
+
+        candidatos = set()
+        for aid in ids:
+            for c in claves[aid]:
+                for otro in miembros.get(c, []):
+                    if otro != aid:
+                        candidatos.add((min(aid, otro), max(aid, otro)))
+
+        faltan = sorted({x for par in candidatos for x in par} - set(activos))
+        for i in range(0, len(faltan), 1000):
+            trozo = faltan[i:i + 1000]
+            cur.execute(
+                f"""
+                SELECT id, codigo, nombre, descripcion FROM activos
+                WHERE id IN ({','.join(['%s'] * len(trozo))})
+                """,
+                trozo,
+            )
+            for r in cur.fetchall():
+                activos[r["id"]] = r
+
+        # puntaje; no se pisa lo que ya se revisó (DESCARTADO/CONFIRMADO)
+        propuestos = []
+        for a, b in sorted(candidatos):
+            if a not in activos or b not in activos:
+                continue
+            p = puntaje(activos[a], activos[b])
+            if p >= UMBRAL:
+                propuestos.append((a, b, round(p, 4)))
+
+        cur.executemany(
+            """
+            INSERT INTO duplicados_candidatos(activo_a, activo_b, puntaje)
+            VALUES (%s, %s, %s)
+            ON CONFLICT (activo_a, activo_b) DO UPDATE SET puntaje = EXCLUDED.puntaje
+            WHERE duplicados_candidatos.estado = 'PENDIENTE'
+            """,
+            propuestos,
+        )
+
+    return len(propuestos)
+
+
+def pendientes(limite: int = 500):
+    """
+    Pares PENDIENTE para la pantalla de revisión, los más parecidos primero.
+    """
+    conn = get_conn()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                SELECT
+                  d.activo_a, d.activo_b, d.puntaje,
+                  a.codigo AS codigo_a, a.nombre AS nombre_a, ca.nombre AS comite_a,
+                  b.codigo AS codigo_b, b.nombre AS nombre_b, cb.nombre AS comite_b
+                FROM duplicados_candidatos d
+                JOIN activos a ON a.id = d.activo_a
+                JOIN activos b ON b.id = d.activo_b
+                JOIN comites ca ON ca.id = a.comite_id
+                JOIN comites cb ON cb.id = b.comite_id
+                WHERE d.estado='PENDIENTE'
+                ORDER BY d.puntaje DESC
+                LIMIT %s
+                """,
+                (limite,),
+            )
+            return [dict(r) for r in cur.fetchall()]
+    finally:
+        conn.close()
+
+
+def marcar(estado: str, pares):
+    """
+    Guarda la revisión (DESCARTADO / CONFIRMADO) de los pares [(activo_a, activo_b)].
+    """
+    conn = get_conn()
+    try:
+        with conn.cursor() as cur:
+            for a, b in pares:
+                cur.execute(
+                    "UPDATE duplicados_candidatos SET estado=%s WHERE activo_a=%s AND activo_b=%s",
+                    (estado, int(a), int(b)),
+                )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    procesados, pares = buscar_duplicados()
+    print("PROCESADOS =", procesados)
+    print("PARES PROPUESTOS =", pares)
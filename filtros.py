@@ -0,0 +1,219 @@
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Optional
+
+from archivo import COLUMNAS_ACTIVO
+from db import qall
+
+# Dimensiones con conteo (faceta -> (columna del id, catálogo de la etiqueta o None))
+FACETAS = {
+    "estado": ("a.estado", None),
+    "categoria": ("a.categoria_id", "categorias"),
+    "ubicacion": ("a.ubicacion_id", "ubicaciones"),
+    "responsable": ("a.responsable_id", "responsables"),
+}
+
+# 0 = "sin asignar" (igual que vista_comite_id 0 = Todos); los SERIAL empiezan en 1
+SIN_ASIGNAR = 0
+
+
+def _en_lista(columna: str, valores):
+    """
+    IN (...) sobre la columna indexada; el 0 se traduce a IS NULL.
+    """
+    ids = [v for v in valores if v != SIN_ASIGNAR]
+    partes = []
+    params = []
+    if ids:
+        partes.append(f"{columna} IN ({','.join(['%s'] * len(ids))})")
+        params.extend(ids)
+    if len(ids) != len(valores):
+        partes.append(f"{columna} IS NULL")
+    return "(" + " OR ".join(partes) + ")", params
+
+
+@dataclass
+class FiltroActivos:
+    """
+    Filtro componible del listado. Cada campo vacío = sin filtrar.
+    Genera predicados parametrizados sobre columnas de `activos a`
+    (sin funciones sobre la columna, para que usen los índices).
+    """
+
+    comite_id: Optional[int] = None
+    estados: tuple = ()
+    categorias: tuple = ()
+    ubicaciones: tuple = ()
+    responsables: tuple = ()
+    desde: Optional[date] = None
+    hasta: Optional[date] = None
+    texto: str = ""
+    incluir_archivados: bool = False
+
+    def fuente(self):
+        """
+        FROM del listado: solo la tabla caliente, salvo que se pidan archivados.
+        Retorna (sql, expresión de la columna archivado).
+        """
+        if not self.incluir_archivados:
+            return "activos a", "FALSE"
+        return (
+            f"""(
+              SELECT {COLUMNAS_ACTIVO}, FALSE AS archivado FROM activos
+              UNION ALL
+              SELECT {COLUMNAS_ACTIVO}, TRUE AS archivado FROM activos_archivo
+            ) a""",
+            "a.archivado",
+        )
+
+    def predicados(self, excluir: Optional[str] = None):
+        """
+        Retorna (lista_sql, params). `excluir` omite una faceta para que
+        sus propias opciones sigan mostrando conteo.
+        """
+        sql = []
+        params = []
+
+        if self.comite_id:
+            sql.append("a.comite_id=%s")
+            params.append(self.comite_id)
+
+        if self.estados and excluir != "estado":
+            sql.append(f"a.estado IN ({','.join(['%s'] * len(self.estados))})")
+            params.extend(self.estados)
+            if "BAJA" not in self.estados:
+                # explícito para que el planner use el índice parcial (estado <> 'BAJA')
+                sql.append("a.estado <> 'BAJA'")
+
+        for faceta, valores in (
+            ("categoria", self.categorias),
+            ("ubicacion", self.ubicaciones),
+            ("responsable", self.responsables),
+        ):
+            if valores and excluir != faceta:
+                s, p = _en_lista(FACETAS[faceta][0], valores)
+                sql.append(s)
+                params.extend(p)
+
+        if self.desde:
+            sql.append("a.fecha_registro >= %s")
+            params.append(self.desde)
+        if self.hasta:
+            # rango semiabierto: incluye todo el día "hasta"
+            sql.append("a.fecha_registro < %s")
+            params.append(self.hasta + timedelta(days=1))
+
+        q = (self.texto or "").strip()
+        if q:
+            sql.append("(a.codigo LIKE %s OR a.nombre LIKE %s)")
+            like = f"%{q}%"
+            params.extend([like, like])
+
+        return sql, params
+
+    def where(self, excluir: Optional[str] = None):
+        """
+        Retorna (where_sql, params) listo para pegar después del FROM.
+        """
+        sql, params = self.predicados(excluir)
+        if not sql:
+            return "", ()
+        return " WHERE " + " AND ".join(sql) + " ", tuple(params)
+
+
+def consultar_listado(filtro: FiltroActivos, limite: int = 100, offset: int = 0):
+    """
+    Una sola ida a la base: página de resultados + total + conteos por faceta.
+    Las ramas del UNION ALL se distinguen por `_tipo` ('fila' / 'faceta' / 'total').
+    La rama de filas va primero y con CASTs para fijar los tipos del UNION.
+    """
+    where, params = filtro.where()
+    fuente, archivado = filtro.fuente()
+    partes = [
+        f"""
+        SELECT * FROM (
+          SELECT
+            'fila' AS _tipo,
+            CAST(NULL AS TEXT) AS _faceta,
+            CAST(NULL AS TEXT) AS _valor,
+            CAST(NULL AS TEXT) AS _etiqueta,
+            CAST(NULL AS BIGINT) AS _n,
+            a.id, a.codigo, a.nombre, a.estado, a.fecha_registro,
+            c.nombre as categoria,
+            u.nombre as ubicacion,
+            r.nombre as responsable,
+            co.nombre as comite,
+            {archivado} AS archivado
+          FROM {fuente}
+          LEFT JOIN categorias c ON c.id = a.categoria_id
+          LEFT JOIN ubicaciones u ON u.id = a.ubicacion_id
+          LEFT JOIN responsables r ON r.id = a.responsable_id
+          JOIN comites co ON co.id = a.comite_id
+          {where}
+          ORDER BY a.id DESC
+          LIMIT %s OFFSET %s
+        ) p
+        """
+    ]
+    todos = list(params) + [int(limite), int(offset)]
+
+    relleno = ", ".join(["NULL"] * 10)
+    for faceta, (col, catalogo) in FACETAS.items():
+        w, p = filtro.where(excluir=faceta)
+        # primero se cuenta por id (sale del índice de la columna) y después se pone la etiqueta
+        join = f"LEFT JOIN {catalogo} t ON t.id = f.valor" if catalogo else ""
+        etiqueta = "t.nombre" if catalogo else "f.valor"
+        partes.append(
+            f"""
+            SELECT 'faceta', '{faceta}', CAST(f.valor AS TEXT), {etiqueta}, f.n, {relleno}
+            FROM (
+              SELECT {col} AS valor, COUNT(*) AS n
+              FROM {fuente}
+              {w}
+              GROUP BY {col}
+            ) f
+            {join}
+            """
+        )
+        todos.extend(p)
+
+    partes.append(
+        f"""
+        SELECT 'total', NULL, NULL, NULL, COUNT(*), {relleno}
+        FROM {fuente}
+        {where}
+        """
+    )
+    todos.extend(params)
+
+    rows = qall(" UNION ALL ".join(partes), tuple(todos))
+
+    filas = []
+    facetas = {f: [] for f in FACETAS}
+    total = 0
+    for r in rows:
+        tipo = r.pop("_tipo")
+        faceta = r.pop("_faceta")
+        valor = r.pop("_valor")
+        etiqueta = r.pop("_etiqueta")
+        n = r.pop("_n")
+        if tipo == "fila":
+            # SQLite devuelve 0/1: mismo tipo que Postgres para la columna checkbox
+            r["archivado"] = bool(r["archivado"])
+            filas.append(r)
+        elif tipo == "faceta":
+            if faceta != "estado":
+                valor = int(valor) if valor is not None else SIN_ASIGNAR
+            facetas[faceta].append(
+                {"valor": valor, "etiqueta": etiqueta or "(sin asignar)", "n": int(n)}
+            )
+        else:
+            total = int(n)
+
+    # el orden del Append entre ramas no está garantizado (Parallel Append)
+    filas.sort(key=lambda x: x["id"], reverse=True)
+
+    for lista in facetas.values():
+        lista.sort(key=lambda x: -x["n"])
+
+    return {"filas": filas, "facetas": facetas, "total": total}
@@ -1,9 +1,6 @@
-import sqlite3
 import unicodedata
-from pathlib import Path
 
-BASE_DIR = Path(__file__).resolve().parent
-DB_PATH = BASE_DIR / "data" / "rap_activos.db"
+from db import DB_PATH, get_conn
 
 OFICIALES = [
     "Control interno",
@@ -26,13 +23,13 @@ def norm(s: str) -> str:
 def main():
     print("DB_PATH =", DB_PATH)
 
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
+    # Sirve igual con Postgres o con el SQLite local (DB_BACKEND)
+    conn = get_conn()
     cur = conn.cursor()
 
     # 1) Asegurar que existan EXACTAMENTE los 6 oficiales (insert si faltan)
     for n in OFICIALES:
-        cur.execute("INSERT OR IGNORE INTO comites(nombre) VALUES (?)", (n,))
+        cur.execute("INSERT INTO comites(nombre) VALUES (%s) ON CONFLICT DO NOTHING", (n,))
     conn.commit()
 
     # 2) Leer todos los comites actuales
@@ -55,8 +52,8 @@ def main():
         if k in id_bueno:
             bueno = id_bueno[k]
             if r["id"] != bueno:
-                cur.execute("UPDATE activos SET comite_id=? WHERE comite_id=?", (bueno, r["id"]))
-                cur.execute("UPDATE usuarios SET comite_id=? WHERE comite_id=?", (bueno, r["id"]))
+                cur.execute("UPDATE activos SET comite_id=%s WHERE comite_id=%s", (bueno, r["id"]))
+                cur.execute("UPDATE usuarios SET comite_id=%s WHERE comite_id=%s", (bueno, r["id"]))
     conn.commit()
 
     # 5) Borrar duplicados
@@ -70,7 +67,7 @@ def main():
             borrar.append(r["id"])
 
     if borrar:
-        placeholders = ",".join(["?"] * len(borrar))
+        placeholders = ",".join(["%s"] * len(borrar))
         cur.execute(f"DELETE FROM comites WHERE id IN ({placeholders})", borrar)
         conn.commit()
 
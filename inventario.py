@@ -0,0 +1,193 @@
+import os
+import sys
+from datetime import datetime, timedelta
+
+from db import get_conn, qall, qone
+
+# Cada cuántos días se toma una foto nueva (mensual por defecto)
+CHECKPOINT_DIAS = int(os.getenv("INVENTARIO_CHECKPOINT_DIAS", "30"))
+# El replay arranca este margen antes de la foto: lo que se confirmó después de
+# tomarla con una hora igual o anterior (mismo segundo en SQLite; en Postgres la
+# hora es la del inicio de la transacción). Re-aplicar en orden es idempotente.
+MARGEN_S = int(os.getenv("INVENTARIO_MARGEN_S", "300"))
+
+# Activos y movimientos calientes + archivo (los archivados también existieron)
+_ACTIVOS = """(
+  SELECT id, codigo, nombre, estado, fecha_registro, comite_id FROM activos
+  UNION ALL
+  SELECT id, codigo, nombre, estado, fecha_registro, comite_id FROM activos_archivo
+)"""
+_MOVIMIENTOS = """(
+  SELECT id, activo_id, fecha, estado_anterior, estado_nuevo FROM movimientos
+  UNION ALL
+  SELECT id, activo_id, fecha, estado_anterior, estado_nuevo FROM movimientos_archivo
+)"""
+
+
+def crear_checkpoint():
+    """
+    Foto del estado actual de todos los activos (calientes + archivo).
+    Retorna {"id", "fecha"} del checkpoint.
+    """
+    conn = get_conn()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(
+                "INSERT INTO inventario_checkpoints(fecha) VALUES (CURRENT_TIMESTAMP) RETURNING id, fecha"
+            )
+            cp = cur.fetchone()
+            cur.execute(
+                f"""
+                INSERT INTO inventario_checkpoint_items(
+                    checkpoint_id, activo_id, comite_id, codigo, nombre, estado
+                )
+                SELECT %s, a.id, a.comite_id, a.codigo, a.nombre, a.estado
+                FROM {_ACTIVOS} a
+                """,
+                (cp["id"],),
+            )
+        conn.commit()
+        return dict(cp)
+    finally:
+        conn.close()
+
+
+def asegurar_checkpoint(dias: int = None):
+    """
+    Crea un checkpoint si el último tiene más de `dias` días (o no hay ninguno).
+    Retorna el checkpoint creado, o None si no hizo falta.
+    """
+    dias = CHECKPOINT_DIAS if dias is None else int(dias)
+    reciente = qone(
+        "SELECT COUNT(*) AS n FROM inventario_checkpoints WHERE fecha > %s",
+        (datetime.now() - timedelta(days=dias),),
+    )
+    if reciente["n"]:
+        return None
+    return crear_checkpoint()
+
+
+def inventario_a_la_fecha(fecha, comite_id=None):
+    """
+    Reconstruye el estado de los activos a `fecha`:
+    - parte del checkpoint más cercano anterior (si existe)
+    - suma los activos registrados entre el checkpoint y la fecha
+    - re-aplica solo los movimientos de ese intervalo (desde un poco antes
+      de la foto, ver MARGEN_S)
+    - quita los activos eliminados en ese intervalo
+    El costo depende del volumen desde el último checkpoint, no de toda la historia.
+
+    Retorna (filas, checkpoint) con filas = [{id, codigo, nombre, comite_id, estado}].
+    """
+    cp = qone(
+        """
+        SELECT id, fecha FROM inventario_checkpoints
+        WHERE fecha <= %s
+        ORDER BY fecha DESC
+        LIMIT 1
+        """,
+        (fecha,),
+    )
+
+    scope = " AND comite_id=%s " if comite_id else ""
+    scope_a = " AND a.comite_id=%s " if comite_id else ""
+    scope_params = (comite_id,) if comite_id else ()
+
+    activos = {}
+
+    # 1) Foto de partida
+    desde_a = ""
+    desde_m = ""
+    desde_e = ""
+    desde_params = ()
+    if cp:
+        for r in qall(
+            f"""
+            SELECT activo_id AS id, codigo, nombre, comite_id, estado
+            FROM inventario_checkpoint_items
+            WHERE checkpoint_id=%s {scope}
+            """,
+            (cp["id"],) + scope_params,
+        ):
+            activos[r["id"]] = r
+        # >= y con margen: setdefault (paso 2) no pisa las filas de la foto
+        desde_a = " AND a.fecha_registro >= %s "
+        desde_m = " AND m.fecha >= %s "
+        desde_e = " AND e.fecha >= %s "
+        desde_params = (cp["fecha"] - timedelta(seconds=MARGEN_S),)
+
+    # 2) Registrados después de la foto: estado con el que nacieron
+    #    (= estado_anterior de su primer cambio; si nunca cambió, el actual)
+    for r in qall(
+        f"""
+        SELECT
+          a.id, a.codigo, a.nombre, a.comite_id,
+          COALESCE(
+            (
+              SELECT m.estado_anterior FROM {_MOVIMIENTOS} m
+              WHERE m.activo_id = a.id AND m.estado_anterior IS NOT NULL
+              ORDER BY m.fecha, m.id
+              LIMIT 1
+            ),
+            a.estado
+          ) AS estado
+        FROM {_ACTIVOS} a
+        WHERE a.fecha_registro <= %s {desde_a} {scope_a}
+        """,
+        (fecha,) + desde_params + scope_params,
+    ):
+        activos.setdefault(r["id"], r)
+
+    # 3) Replay de los movimientos del intervalo [checkpoint - margen, fecha]
+    #    Con comité: solo los de los activos de los pasos 1 y 2
+    alcance_m = ""
+    alcance_params = ()
+    if comite_id:
+        alcance = [f"SELECT a.id FROM {_ACTIVOS} a WHERE a.fecha_registro <= %s {desde_a} {scope_a}"]
+        alcance_params = (fecha,) + desde_params + scope_params
+        if cp:
+            alcance.insert(
+                0,
+                "SELECT activo_id FROM inventario_checkpoint_items WHERE checkpoint_id=%s AND comite_id=%s",
+            )
+            alcance_params = (cp["id"], comite_id) + alcance_params
+        alcance_m = f" AND m.activo_id IN ({' UNION ALL '.join(alcance)}) "
+
+    movs = qall(
+        f"""
+        SELECT m.activo_id, m.estado_nuevo
+        FROM {_MOVIMIENTOS} m
+        WHERE m.estado_nuevo IS NOT NULL
+          AND m.fecha <= %s {desde_m} {alcance_m}
+        ORDER BY m.fecha, m.id
+        """,
+        (fecha,) + desde_params + alcance_params,
+    )
+    for m in movs:
+        a = activos.get(m["activo_id"])
+        if a is not None:
+            a["estado"] = m["estado_nuevo"]
+
+    # 4) Borrados definitivos hasta la fecha (sus movimientos se fueron con ellos)
+    if activos:
+        for r in qall(
+            f"""
+            SELECT e.activo_id FROM activos_eliminados e
+            WHERE e.fecha <= %s {desde_e} {scope}
+            """,
+            (fecha,) + desde_params + scope_params,
+        ):
+            activos.pop(r["activo_id"], None)
+
+    filas = sorted(activos.values(), key=lambda x: x["id"])
+    return filas, (dict(cp) if cp else None)
+
+
+if __name__ == "__main__":
+    # python inventario.py          -> checkpoint si ya toca
+    # python inventario.py --forzar -> checkpoint ya
+    if "--forzar" in sys.argv:
+        cp = crear_checkpoint()
+    else:
+        cp = asegurar_checkpoint()
+    print("CHECKPOINT =", cp or "no hacía falta")
@@ -0,0 +1,258 @@
+import functools
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+
+# Reruns que se guardan por sesión (buffer circular)
+MAX_RERUNS = int(os.getenv("PERFIL_MAX_RERUNS", "50"))
+# Intervalo del muestreo de pilas (segundos)
+INTERVALO_MUESTREO = float(os.getenv("PERFIL_INTERVALO_MUESTREO", "0.005"))
+
+# Cada rerun de Streamlit corre en su propio hilo: el perfil activo es por hilo
+_local = threading.local()
+
+
+def _actual():
+    return getattr(_local, "rerun", None)
+
+
+class _Muestreador(threading.Thread):
+    """
+    Toma la pila del hilo perfilado cada `intervalo` y la acumula en formato
+    "colapsado" (archivo:función;... -> muestras), listo para flamegraph.
+    """
+
+    def __init__(self, hilo_id: int, intervalo: float):
+        super().__init__(daemon=True)
+        self.hilo_id = hilo_id
+        self.intervalo = intervalo
+        self.pilas = Counter()
+        self._parar = threading.Event()
+
+    def run(self):
+        while not self._parar.wait(self.intervalo):
+            frame = sys._current_frames().get(self.hilo_id)
+            pila = []
+            while frame is not None:
+                code = frame.f_code
+                pila.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            if pila:
+                self.pilas[";".join(reversed(pila))] += 1
+
+    def detener(self):
+        self._parar.set()
+        self.join()
+        return dict(self.pilas.most_common())
+
+
+@contextmanager
+def rerun(buffer, muestreo: bool = False):
+    """
+    Perfila un rerun completo y lo agrega a `buffer` (deque con maxlen).
+    buffer=None -> perfil apagado, costo casi cero.
+    """
+    if buffer is None:
+        yield None
+        return
+
+    r = {
+        "inicio": datetime.now().isoformat(timespec="seconds"),
+        "db_s": 0.0,
+        "db_consultas": 0,
+        "render_s": 0.0,
+        "secciones": [],
+        "_nivel": 0,
+    }
+    _local.rerun = r
+    muestreador = None
+    if muestreo:
+        muestreador = _Muestreador(threading.get_ident(), INTERVALO_MUESTREO)
+        muestreador.start()
+
+    t0 = time.perf_counter()
+    try:
+        yield r
+    finally:
+        # también corre con st.rerun()/st.stop() (son excepciones)
+        r["total_s"] = time.perf_counter() - t0
+        r["python_s"] = r["total_s"] - r["db_s"] - r["render_s"]
+        if muestreador:
+            r["pilas"] = muestreador.detener()
+        r.pop("_nivel")
+        _local.rerun = None
+        buffer.append(r)
+
+
+@contextmanager
+def seccion(nombre: str):
+    """
+    Tiempo de pared de una sección, separado en DB / render / Python.
+    """
+    r = _actual()
+    if r is None:
+        yield
+        return
+
+    nivel = r["_nivel"]
+    r["_nivel"] += 1
+    db0, render0 = r["db_s"], r["render_s"]
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        total = time.perf_counter() - t0
+        db = r["db_s"] - db0
+        render = r["render_s"] - render0
+        r["_nivel"] = nivel
+        r["secciones"].append(
+            {
+                "nombre": nombre,
+                "nivel": nivel,
+                "total_s": total,
+                "db_s": db,
+                "render_s": render,
+                "python_s": total - db - render,
+            }
+        )
+
+
+def perfilado(nombre: str):
+    """
+    Decorador: la función completa como una sección.
+    """
+
+    def deco(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with seccion(nombre):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return deco
+
+
+@contextmanager
+def _acumular(campo: str, contador: str = None):
+    r = _actual()
+    if r is None:
+        yield
+        return
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        r[campo] += time.perf_counter() - t0
+        if contador:
+            r[contador] += 1
+
+
+def db(contar: bool = True):
+    """
+    Envuelve una ida a la base; `contar` la suma a db_consultas.
+    """
+    return _acumular("db_s", "db_consultas" if contar else None)
+
+
+class _CursorMedido:
+    """
+    Cursor cuyo execute/fetch* se suma al tiempo de base del rerun.
+    """
+
+    def __init__(self, cur):
+        self._cur = cur
+
+    def __enter__(self):
+        self._cur.__enter__()
+        return self
+
+    def __exit__(self, *exc):
+        return self._cur.__exit__(*exc)
+
+    def execute(self, *args, **kwargs):
+        with db():
+            self._cur.execute(*args, **kwargs)
+        return self
+
+    def executemany(self, *args, **kwargs):
+        with db():
+            self._cur.executemany(*args, **kwargs)
+        return self
+
+    def fetchone(self):
+        with db(contar=False):
+            return self._cur.fetchone()
+
+    def fetchmany(self, *args, **kwargs):
+        with db(contar=False):
+            return self._cur.fetchmany(*args, **kwargs)
+
+    def fetchall(self):
+        with db(contar=False):
+            return self._cur.fetchall()
+
+    def __getattr__(self, nombre):
+        return getattr(self._cur, nombre)
+
+
+class _ConnMedida:
+    """
+    Conexión cuyos cursores, commit y rollback se suman al tiempo de base.
+    """
+
+    def __init__(self, conn):
+        object.__setattr__(self, "_conn", conn)
+
+    def __enter__(self):
+        self._conn.__enter__()
+        return self
+
+    def __exit__(self, *exc):
+        with db(contar=False):
+            return self._conn.__exit__(*exc)
+
+    def cursor(self, *args, **kwargs):
+        return _CursorMedido(self._conn.cursor(*args, **kwargs))
+
+    def execute(self, *args, **kwargs):
+        with db():
+            return _CursorMedido(self._conn.execute(*args, **kwargs))
+
+    def commit(self):
+        with db(contar=False):
+            self._conn.commit()
+
+    def rollback(self):
+        with db(contar=False):
+            self._conn.rollback()
+
+    def __getattr__(self, nombre):
+        return getattr(self._conn, nombre)
+
+    def __setattr__(self, nombre, valor):
+        setattr(self._conn, nombre, valor)
+
+
+def conexion(abrir):
+    """
+    Abre una conexión con `abrir()` (lo usa db.get_conn).
+    Con un rerun perfilado, conectar y todo lo que pase por la conexión cuenta
+    como tiempo de base, la use quien la use (helpers de db.py o módulos con
+    get_conn propio); cada execute es una consulta.
+    """
+    if _actual() is None:
+        return abrir()
+    with db(contar=False):
+        return _ConnMedida(abrir())
+
+
+def render():
+    """
+    Envuelve widgets pesados de Streamlit (data_editor, dataframe...).
+    """
+    return _acumular("render_s")
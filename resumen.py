@@ -0,0 +1,109 @@
+import sys
+
+from db import DB_BACKEND, get_conn, qall, qone
+
+# Contadores del Panel (tabla resumen_activos, mantenida por triggers sobre activos)
+COLUMNAS = (
+    "total", "activo", "reparacion", "baja",
+    "sin_responsable", "sin_ubicacion", "sin_categoria",
+)
+
+# Los mismos contadores calculados desde activos (para verificar/reconstruir)
+_CONTEO_REAL = """
+SELECT
+  comite_id,
+  COUNT(*) AS total,
+  SUM(CASE WHEN estado='ACTIVO' THEN 1 ELSE 0 END) AS activo,
+  SUM(CASE WHEN estado='REPARACION' THEN 1 ELSE 0 END) AS reparacion,
+  SUM(CASE WHEN estado='BAJA' THEN 1 ELSE 0 END) AS baja,
+  SUM(CASE WHEN responsable_id IS NULL THEN 1 ELSE 0 END) AS sin_responsable,
+  SUM(CASE WHEN ubicacion_id IS NULL THEN 1 ELSE 0 END) AS sin_ubicacion,
+  SUM(CASE WHEN categoria_id IS NULL THEN 1 ELSE 0 END) AS sin_categoria
+FROM activos
+GROUP BY comite_id
+"""
+
+
+def leer(comite_id=None) -> dict:
+    """
+    Contadores de un comité, o la suma de todos (comite_id=None).
+    Lee una fila por comité: no depende del tamaño del inventario.
+    """
+    where = " WHERE comite_id=%s " if comite_id else ""
+    params = (comite_id,) if comite_id else ()
+    row = qone(
+        f"""
+        SELECT {", ".join(f"COALESCE(SUM({c}), 0) AS {c}" for c in COLUMNAS)}
+        FROM resumen_activos
+        {where}
+        """,
+        params,
+    )
+    return {c: int(row[c]) for c in COLUMNAS}
+
+
+def verificar():
+    """
+    Compara resumen_activos con un conteo real de activos (una sola consulta,
+    así ambos lados salen de la misma foto).
+    Retorna [{comite_id, columna: diferencia, ...}] de los comités descuadrados
+    (diferencia = resumen - real). Lista vacía = todo cuadra.
+    """
+    suma = ", ".join(f"SUM({c}) AS {c}" for c in COLUMNAS)
+    resta = ", ".join(f"-{c}" for c in COLUMNAS)
+    filas = qall(
+        f"""
+        SELECT comite_id, {suma}
+        FROM (
+          SELECT comite_id, {", ".join(COLUMNAS)} FROM resumen_activos
+          UNION ALL
+          SELECT comite_id, {resta} FROM ({_CONTEO_REAL}) r
+        ) d
+        GROUP BY comite_id
+        HAVING {" OR ".join(f"SUM({c}) <> 0" for c in COLUMNAS)}
+        ORDER BY comite_id
+        """
+    )
+    return [{k: int(v) for k, v in f.items()} for f in filas]
+
+
+def reconstruir():
+    """
+    Recalcula resumen_activos desde cero en una transacción.
+    En Postgres bloquea las escrituras sobre activos mientras tanto (las lecturas siguen).
+    Retorna cuántos comités quedaron en el resumen.
+    """
+    conn = get_conn()
+    try:
+        with conn.cursor() as cur:
+            if DB_BACKEND == "postgres":
+                cur.execute("LOCK TABLE activos IN SHARE MODE")
+            cur.execute("DELETE FROM resumen_activos")
+            cur.execute(
+                f"""
+                INSERT INTO resumen_activos(comite_id, {", ".join(COLUMNAS)})
+                {_CONTEO_REAL}
+                """
+            )
+            n = cur.rowcount
+        conn.commit()
+        return n
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    # python resumen.py               -> verifica (código 1 si hay descuadre)
+    # python resumen.py --reconstruir -> recalcula desde activos
+    if "--reconstruir" in sys.argv:
+        print("COMITES =", reconstruir())
+    else:
+        descuadres = verificar()
+        for d in descuadres:
+            print("DESCUADRE =", d)
+        print("OK" if not descuadres else f"{len(descuadres)} comité(s) descuadrados")
+        if descuadres:
+            sys.exit(1)
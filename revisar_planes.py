@@ -0,0 +1,489 @@
+import difflib
+import json
+import os
+import sys
+import tempfile
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+from urllib.parse import quote
+
+# =========================
+# Revisión de planes de consulta
+#
+#   PLANES_DSN=postgresql://postgres@localhost/rap_planes python revisar_planes.py
+#   PLANES_DSN=... python revisar_planes.py --actualizar   (reescribe planes_esperados.json)
+#
+# Crea un schema desechable (planes_rap) en PLANES_DSN, lo llena a escala real,
+# corre las consultas de la app y compara EXPLAIN (FORMAT JSON) contra
+# planes_esperados.json. Sale con código 1 si hay Seq Scan en tablas grandes
+# o si el costo estimado se pasa del margen. Usar una base LOCAL, no la de Railway.
+# =========================
+
+BASE_DIR = Path(__file__).resolve().parent
+ESPERADOS_PATH = BASE_DIR / "planes_esperados.json"
+
+SCHEMA = "planes_rap"
+N_ACTIVOS = int(os.getenv("PLANES_ACTIVOS", "100000"))
+# Tablas vigiladas y desde cuántas filas un Seq Scan cuenta como regresión
+TABLAS_VIGILADAS = ("activos", "movimientos", "activos_archivo", "movimientos_archivo")
+UMBRAL_SEQ = int(os.getenv("PLANES_UMBRAL_SEQ", "10000"))
+# Margen sobre el costo esperado: relativo + absoluto (costos chicos bailan)
+TOLERANCIA = float(os.getenv("PLANES_TOLERANCIA", "0.5"))
+HOLGURA = float(os.getenv("PLANES_HOLGURA", "50"))
+
+_DSN = os.getenv("PLANES_DSN", "").strip()
+if not _DSN:
+    sys.exit("Falta PLANES_DSN (una base Postgres local para sembrar datos de prueba).")
+
+# Todo lo que abra la app (get_conn) cae en el schema desechable
+_sep = "&" if "?" in _DSN else "?"
+os.environ["DB_BACKEND"] = "postgres"
+os.environ["DATABASE_PUBLIC_URL"] = f"{_DSN}{_sep}options={quote(f'-csearch_path={SCHEMA}')}"
+os.environ.setdefault("PGSSLMODE", "prefer")
+os.environ["ANALITICA_DIR"] = tempfile.mkdtemp(prefix="planes_analitica_")
+
+import activos  # noqa: E402
+import analitica  # noqa: E402
+import archivo  # noqa: E402
+import auth  # noqa: E402
+import codigos  # noqa: E402
+import db  # noqa: E402
+import duplicados  # noqa: E402
+import inventario  # noqa: E402
+import resumen  # noqa: E402
+from filtros import FiltroActivos, consultar_listado  # noqa: E402
+
+MODULOS_CON_CONEXION = (db, auth, activos, archivo, inventario, codigos, duplicados)
+
+
+# ======================
+# Grabación de consultas
+# ======================
+_grabadas = []  # [{"nombre", "sql", "params", "permitir_seq"}]
+_caso = {"nombre": None, "n": 0, "permitir_seq": False}
+
+
+def _grabar(sql, params):
+    if _caso["nombre"] is None:
+        return
+    _caso["n"] += 1
+    _grabadas.append(
+        {
+            "nombre": f"{_caso['nombre']}#{_caso['n']}",
+            "sql": sql,
+            "params": tuple(params or ()),
+            "permitir_seq": _caso["permitir_seq"],
+        }
+    )
+
+
+@contextmanager
+def caso(nombre: str, permitir_seq: bool = False):
+    """
+    Todo lo que se ejecute adentro queda grabado como nombre#1, nombre#2...
+    permitir_seq=True solo para recorridos completos a propósito (exportes, fotos).
+    """
+    _caso.update(nombre=nombre, n=0, permitir_seq=permitir_seq)
+    try:
+        yield
+    finally:
+        _caso.update(nombre=None, n=0, permitir_seq=False)
+
+
+class _CursorGrabador:
+    def __init__(self, cur):
+        self._cur = cur
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._cur.close()
+
+    def execute(self, sql, params=()):
+        _grabar(sql, params)
+        self._cur.execute(sql, params)
+        return self
+
+    def executemany(self, sql, seq):
+        seq = list(seq)
+        if seq:
+            _grabar(sql, seq[0])
+        self._cur.executemany(sql, seq)
+        return self
+
+    def __getattr__(self, nombre):
+        return getattr(self._cur, nombre)
+
+
+class _ConnGrabadora:
+    def __init__(self, conn):
+        self._conn = conn
+
+    def cursor(self):
+        return _CursorGrabador(self._conn.cursor())
+
+    def __getattr__(self, nombre):
+        return getattr(self._conn, nombre)
+
+
+_get_conn_real = db.get_conn
+
+
+def _get_conn_grabadora():
+    return _ConnGrabadora(_get_conn_real())
+
+
+# ======================
+# Datos de prueba
+# ======================
+def sembrar():
+    conn = _get_conn_real()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+            cur.execute(f"CREATE SCHEMA {SCHEMA}")
+            cur.execute((BASE_DIR / "schema.sql").read_text(encoding="utf-8"))
+        conn.commit()
+    finally:
+        conn.close()
+
+    db.init_db()
+
+    conn = _get_conn_real()
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT setseed(0.42)")
+            cur.execute(
+                "INSERT INTO comites(nombre) SELECT 'Comité ' || g FROM generate_series(1, 12) g"
+            )
+            cur.execute(
+                "INSERT INTO categorias(nombre) SELECT 'Categoría ' || g FROM generate_series(1, 40) g"
+            )
+            cur.execute(
+                "INSERT INTO ubicaciones(nombre) SELECT 'Ubicación ' || g FROM generate_series(1, 150) g"
+            )
+            cur.execute(
+                "INSERT INTO responsables(nombre) SELECT 'Responsable ' || g FROM generate_series(1, 800) g"
+            )
+            cur.execute(
+                """
+                INSERT INTO usuarios(nombre, usuario, clave, rol, comite_id, activo)
+                SELECT 'Operador ' || g, 'op' || g, 'x', 'OPERADOR', 1 + g % 18, TRUE
+                FROM generate_series(1, 300) g
+                """
+            )
+            # fechas relativas a hoy (los últimos ~6 años): el archivo, los checkpoints y
+            # las ventanas "últimos N días" ven los mismos datos sin importar cuándo se corra.
+            # Carga masiva sin el trigger del resumen; se reconstruye al final
+            cur.execute("ALTER TABLE activos DISABLE TRIGGER trg_resumen_activos")
+            cur.execute(
+                """
+                INSERT INTO activos(
+                    codigo, nombre, descripcion, estado, fecha_registro,
+                    categoria_id, ubicacion_id, responsable_id, comite_id
+                )
+                SELECT
+                  'S-' || lpad(g::text, 7, '0'),
+                  (ARRAY['Portátil','Silla','Escritorio','Impresora','Monitor','Archivador',
+                         'Teléfono','Proyector'])[1 + floor(random() * 8)::int] || ' ' || g,
+                  'Activo sembrado ' || g,
+                  CASE WHEN r < 0.80 THEN 'ACTIVO' WHEN r < 0.87 THEN 'REPARACION' ELSE 'BAJA' END,
+                  hoy - INTERVAL '2100 days' + (g::float / %s) * INTERVAL '2100 days',
+                  CASE WHEN random() < 0.1 THEN NULL ELSE 1 + floor(random() * 43)::int END,
+                  CASE WHEN random() < 0.1 THEN NULL ELSE 1 + floor(random() * 153)::int END,
+                  CASE WHEN random() < 0.2 THEN NULL ELSE 1 + floor(random() * 802)::int END,
+                  1 + g %% 18
+                FROM (SELECT g, random() AS r FROM generate_series(1, %s) g) s,
+                     (SELECT date_trunc('day', LOCALTIMESTAMP) AS hoy) h
+                """,
+                (N_ACTIVOS, N_ACTIVOS),
+            )
+            cur.execute(
+                """
+                INSERT INTO movimientos(activo_id, fecha, tipo, detalle, estado_nuevo)
+                SELECT id, fecha_registro, 'REGISTRO', 'Sembrado', 'ACTIVO' FROM activos
+                """
+            )
+            cur.execute(
+                """
+                INSERT INTO movimientos(activo_id, fecha, tipo, detalle, estado_anterior, estado_nuevo)
+                SELECT id, LEAST(fecha_registro + INTERVAL '30 days', LOCALTIMESTAMP),
+                       'CAMBIO_ESTADO', 'Sembrado', 'ACTIVO', estado
+                FROM activos WHERE estado <> 'ACTIVO'
+                """
+            )
+            cur.execute("ALTER TABLE activos ENABLE TRIGGER trg_resumen_activos")
+        conn.commit()
+    finally:
+        conn.close()
+
+    # rutas reales de la app para el resto del estado
+    resumen.reconstruir()
+    archivo.archivar_bajas(dias=365 * 4)
+    for dias in (75, 45, 10):
+        cp = inventario.crear_checkpoint()
+        db.exec_sql(
+            "UPDATE inventario_checkpoints SET fecha=%s WHERE id=%s",
+            (datetime.now() - timedelta(days=dias), cp["id"]),
+        )
+    codigos.configurar_serie(1, "S-", 7)
+    duplicados.buscar_duplicados()
+
+    conn = _get_conn_real()
+    try:
+        conn.autocommit = True
+        # muestra >= tamaño de las tablas (300 x target filas): estadísticas (y planes)
+        # iguales en cada corrida; VACUUM deja el mapa de visibilidad listo (Index Only Scan)
+        conn.execute("SET default_statistics_target = 10000")
+        conn.execute("VACUUM ANALYZE")
+    finally:
+        conn.close()
+
+
+# ======================
+# Consultas de la app
+# ======================
+def correr_casos():
+    hoy = datetime.now().date()
+
+    # --- auth.py
+    with caso("auth.login"):
+        auth.login("admin", "admin123")
+    with caso("auth.crear_usuario"):
+        auth.crear_usuario_admin("Nuevo", "nuevo_planes", "x", "OPERADOR", 1)
+
+    with caso("auth.usuarios"):
+        auth.listar_usuarios()
+    nuevo_usuario = db.qone("SELECT id FROM usuarios WHERE usuario='nuevo_planes'")["id"]
+    with caso("auth.eliminar_usuarios"):
+        auth.eliminar_usuarios([nuevo_usuario])
+
+    # --- resumen.py
+    with caso("resumen.todos"):
+        resumen.leer()
+    with caso("resumen.comite"):
+        resumen.leer(3)
+    with caso("resumen.verificar", permitir_seq=True):
+        # conteo real completo a propósito (comando de mantenimiento)
+        resumen.verificar()
+
+    # --- activos.py
+    with caso("activos.comites"):
+        activos.listar_comites()
+    with caso("activos.registrar"):
+        nuevo = activos.registrar(1, "S-9000001", "Nuevo", "", "ACTIVO")
+    vigente = db.qone("SELECT MIN(id) AS id FROM activos WHERE estado='ACTIVO'")["id"]
+    with caso("activos.baja"):
+        activos.dar_de_baja(vigente)
+    with caso("activos.eliminar"):
+        activos.eliminar(nuevo)
+
+    # --- filtros.py: variantes de alcance del listado
+    variantes = {
+        "todos": FiltroActivos(),
+        "comite": FiltroActivos(comite_id=3),
+        "comite_vigentes": FiltroActivos(comite_id=3, estados=("ACTIVO", "REPARACION")),
+        "categoria": FiltroActivos(categorias=(5,)),
+        "sin_responsable": FiltroActivos(comite_id=3, responsables=(0,)),
+        "fechas": FiltroActivos(desde=hoy - timedelta(days=30), hasta=hoy),
+        "texto": FiltroActivos(comite_id=3, texto="Silla"),
+        "archivados": FiltroActivos(comite_id=3, incluir_archivados=True),
+    }
+    for nombre, filtro in variantes.items():
+        # "todos" y el texto libre recorren la tabla a propósito (sin filtro selectivo / LIKE '%x%')
+        with caso(f"filtros.{nombre}", permitir_seq=nombre in ("todos", "texto")):
+            consultar_listado(filtro, 100, 0)
+    with caso("filtros.comite.pagina_50"):
+        consultar_listado(variantes["comite"], 100, 5000)
+
+    # --- inventario.py
+    with caso("inventario.asegurar_checkpoint"):
+        inventario.asegurar_checkpoint()
+    with caso("inventario.a_la_fecha_comite"):
+        inventario.inventario_a_la_fecha(datetime.now() - timedelta(days=20), 3)
+    with caso("inventario.a_la_fecha_todos"):
+        inventario.inventario_a_la_fecha(datetime.now() - timedelta(days=20))
+    with caso("inventario.checkpoint", permitir_seq=True):
+        inventario.crear_checkpoint()
+
+    # --- codigos.py
+    with caso("codigos.serie"):
+        codigos.serie_comite(1)
+    with caso("codigos.reservar"):
+        codigos.reservar_codigos(1, 1000)
+    with caso("codigos.importar"):
+        codigos.importar_activos(1, [{"nombre": f"Importado {i}"} for i in range(50)])
+    with caso("codigos.configurar", permitir_seq=True):
+        # LIKE 'S-%' sin índice de patrón: operación de admin, una vez
+        codigos.configurar_serie(2, "DP-")
+
+    # --- duplicados.py
+    # corrida incremental: los últimos 100 activos quedan como "cambiados"
+    db.exec_sql(
+        "DELETE FROM duplicados_firmas WHERE activo_id IN (SELECT id FROM activos ORDER BY id DESC LIMIT 100)"
+    )
+    with caso("duplicados.incremental"):
+        duplicados.buscar_duplicados()
+    with caso("duplicados.pendientes"):
+        pares = duplicados.pendientes()
+    with caso("duplicados.marcar"):
+        duplicados.marcar("DESCARTADO", [(p["activo_a"], p["activo_b"]) for p in pares[:5]] or [(1, 2)])
+
+    # --- analitica.py (el primer exporte es completo; el que importa es el incremental)
+    try:
+        analitica.exportar_snapshot()
+        with caso("analitica.incremental"):
+            analitica.exportar_snapshot()
+    except RuntimeError as e:
+        print(f"(analítica omitida: {e})")
+
+    # --- archivo.py (al final: mueve datos)
+    # IN de LOTE ids sobre movimientos: a esta escala el Seq Scan es más barato que
+    # LOTE búsquedas por índice; lo vigila el costo
+    with caso("archivo.archivar", permitir_seq=True):
+        archivo.archivar_bajas(dias=365 * 3)
+
+
+# ======================
+# EXPLAIN y comparación
+# ======================
+def _forma(nodo, nivel=0, lineas=None, seq=None):
+    """
+    Plan resumido: un nodo por línea (tipo, tabla, índice) + Seq Scans encontrados.
+    """
+    lineas = [] if lineas is None else lineas
+    seq = [] if seq is None else seq
+    texto = nodo["Node Type"]
+    if "Relation Name" in nodo:
+        texto += f" on {nodo['Relation Name']}"
+    if "Index Name" in nodo:
+        texto += f" using {nodo['Index Name']}"
+    lineas.append("  " * nivel + texto)
+    if nodo["Node Type"] == "Seq Scan":
+        seq.append(nodo.get("Relation Name"))
+    for hijo in nodo.get("Plans", []):
+        _forma(hijo, nivel + 1, lineas, seq)
+    return lineas, seq
+
+
+def explicar():
+    conn = _get_conn_real()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(
+                "SELECT relname, reltuples FROM pg_class WHERE relname = ANY(%s)",
+                (list(TABLAS_VIGILADAS),),
+            )
+            filas = {r["relname"]: r["reltuples"] for r in cur.fetchall()}
+
+            planes = {}
+            for g in _grabadas:
+                cur.execute("EXPLAIN (FORMAT JSON) " + g["sql"], g["params"])
+                raiz = cur.fetchone()["QUERY PLAN"][0]["Plan"]
+                lineas, seq = _forma(raiz)
+                planes[g["nombre"]] = {
+                    "costo": raiz["Total Cost"],
+                    "plan": lineas,
+                    "seq": seq,
+                    "permitir_seq": g["permitir_seq"],
+                }
+        conn.rollback()
+        return planes, filas
+    finally:
+        conn.close()
+
+
+def comparar(planes, filas, esperados):
+    fallas = []
+    for nombre, p in planes.items():
+        problemas = []
+
+        if not p["permitir_seq"]:
+            for tabla in p["seq"]:
+                if tabla in TABLAS_VIGILADAS and filas.get(tabla, 0) > UMBRAL_SEQ:
+                    problemas.append(f"Seq Scan sobre {tabla} (~{int(filas[tabla])} filas)")
+
+        esp = esperados.get(nombre)
+        if esp is None:
+            problemas.append("sin plan esperado (corre con --actualizar y revisa el diff)")
+        else:
+            limite = esp["costo"] * (1 + TOLERANCIA) + HOLGURA
+            if p["costo"] > limite:
+                problemas.append(
+                    f"costo estimado {p['costo']:.1f} > {limite:.1f} "
+                    f"(esperado {esp['costo']:.1f} +{TOLERANCIA:.0%})"
+                )
+
+        if problemas:
+            diff = difflib.unified_diff(
+                esp["plan"] if esp else [], p["plan"], "esperado", "actual", lineterm=""
+            )
+            fallas.append((nombre, problemas, list(diff)))
+    return fallas
+
+
+def _borrar_schema():
+    conn = _get_conn_real()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def main():
+    actualizar = "--actualizar" in sys.argv
+
+    print(f"Sembrando {N_ACTIVOS} activos en el schema {SCHEMA}...")
+    sembrar()
+
+    for m in MODULOS_CON_CONEXION:
+        m.get_conn = _get_conn_grabadora
+    try:
+        correr_casos()
+    finally:
+        for m in MODULOS_CON_CONEXION:
+            m.get_conn = _get_conn_real
+
+    try:
+        planes, filas = explicar()
+    finally:
+        _borrar_schema()
+    print(f"Consultas revisadas: {len(planes)}")
+
+    if actualizar:
+        ESPERADOS_PATH.write_text(
+            json.dumps(
+                {n: {"costo": round(p["costo"], 2), "plan": p["plan"]} for n, p in sorted(planes.items())},
+                ensure_ascii=False,
+                indent=2,
+            )
+            + "\n",
+            encoding="utf-8",
+        )
+        print(f"✅ Expectativas escritas en {ESPERADOS_PATH.name}")
+
+    esperados = json.loads(ESPERADOS_PATH.read_text(encoding="utf-8")) if ESPERADOS_PATH.exists() else {}
+    fallas = comparar(planes, filas, esperados)
+
+    for nombre in sorted(set(esperados) - set(planes)):
+        print(f"⚠️ {nombre}: ya no se ejecuta (bórrala de {ESPERADOS_PATH.name})")
+
+    for nombre, problemas, diff in fallas:
+        print(f"\n❌ {nombre}")
+        for pr in problemas:
+            print(f"   - {pr}")
+        for linea in diff:
+            print(f"   {linea}")
+
+    if fallas:
+        print(f"\n{len(fallas)} consulta(s) con regresión de plan.")
+        sys.exit(1)
+    print("✅ Planes dentro de lo esperado.")
+
+
+if __name__ == "__main__":
+    main()
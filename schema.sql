@@ -94,3 +94,263 @@ CREATE TABLE IF NOT EXISTS movimientos (
 CREATE INDEX IF NOT EXISTS idx_activos_comite ON activos(comite_id);
 CREATE INDEX IF NOT EXISTS idx_activos_estado ON activos(estado);
 CREATE INDEX IF NOT EXISTS idx_activos_codigo ON activos(codigo);
+
+-- Índices para los filtros/facetas del listado
+CREATE INDEX IF NOT EXISTS idx_activos_categoria ON activos(categoria_id);
+CREATE INDEX IF NOT EXISTS idx_activos_ubicacion ON activos(ubicacion_id);
+CREATE INDEX IF NOT EXISTS idx_activos_responsable ON activos(responsable_id);
+CREATE INDEX IF NOT EXISTS idx_activos_fecha_registro ON activos(fecha_registro);
+CREATE INDEX IF NOT EXISTS idx_activos_comite_id_desc ON activos(comite_id, id DESC);
+-- Parcial solo donde el listado pone el predicado (estados elegidos sin BAJA)
+CREATE INDEX IF NOT EXISTS idx_activos_vigentes_comite_id ON activos(comite_id, id DESC) WHERE estado <> 'BAJA';
+
+CREATE INDEX IF NOT EXISTS idx_movimientos_activo ON movimientos(activo_id, fecha);
+
+-- =========================
+-- Archivo (datos fríos): activos BAJA antiguos y sus movimientos
+-- Se llenan con archivo.py; mismo id que tenían en la tabla caliente.
+-- =========================
+
+-- TABLA: activos_archivo
+CREATE TABLE IF NOT EXISTS activos_archivo (
+  id INTEGER PRIMARY KEY,
+  codigo TEXT,
+  nombre TEXT NOT NULL,
+  descripcion TEXT,
+  estado TEXT NOT NULL,
+  fecha_registro TIMESTAMP NOT NULL,
+
+  categoria_id INTEGER NULL,
+  ubicacion_id INTEGER NULL,
+  responsable_id INTEGER NULL,
+  comite_id INTEGER NOT NULL,
+
+  fecha_archivo TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+-- TABLA: movimientos_archivo
+CREATE TABLE IF NOT EXISTS movimientos_archivo (
+  id INTEGER PRIMARY KEY,
+  activo_id INTEGER NOT NULL,
+  fecha TIMESTAMP NOT NULL,
+  tipo TEXT NOT NULL,
+  detalle TEXT
+);
+
+CREATE INDEX IF NOT EXISTS idx_activos_archivo_comite ON activos_archivo(comite_id, id DESC);
+CREATE INDEX IF NOT EXISTS idx_activos_archivo_fecha_archivo ON activos_archivo(fecha_archivo);
+CREATE INDEX IF NOT EXISTS idx_movimientos_archivo_activo ON movimientos_archivo(activo_id, fecha);
+
+-- =========================
+-- Inventario a la fecha (inventario.py)
+-- =========================
+
+-- Movimientos con estado estructurado (para poder reconstruir el pasado)
+ALTER TABLE movimientos ADD COLUMN IF NOT EXISTS estado_anterior TEXT;
+ALTER TABLE movimientos ADD COLUMN IF NOT EXISTS estado_nuevo TEXT;
+ALTER TABLE movimientos_archivo ADD COLUMN IF NOT EXISTS estado_anterior TEXT;
+ALTER TABLE movimientos_archivo ADD COLUMN IF NOT EXISTS estado_nuevo TEXT;
+
+-- Movimientos viejos de "Dar de baja (rápido)": solo el detalle decía el estado
+UPDATE movimientos SET estado_nuevo='BAJA'
+WHERE estado_nuevo IS NULL AND tipo='CAMBIO_ESTADO' AND detalle LIKE 'Marcado como BAJA%';
+UPDATE movimientos_archivo SET estado_nuevo='BAJA'
+WHERE estado_nuevo IS NULL AND tipo='CAMBIO_ESTADO' AND detalle LIKE 'Marcado como BAJA%';
+
+-- TABLA: inventario_checkpoints (foto periódica, p.ej. mensual)
+CREATE TABLE IF NOT EXISTS inventario_checkpoints (
+  id SERIAL PRIMARY KEY,
+  fecha TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+-- TABLA: inventario_checkpoint_items (estado de cada activo en la foto)
+CREATE TABLE IF NOT EXISTS inventario_checkpoint_items (
+  checkpoint_id INTEGER NOT NULL,
+  activo_id INTEGER NOT NULL,
+  comite_id INTEGER NOT NULL,
+  codigo TEXT,
+  nombre TEXT NOT NULL,
+  estado TEXT NOT NULL,
+
+  PRIMARY KEY (checkpoint_id, activo_id),
+
+  CONSTRAINT fk_cp_items_checkpoint
+    FOREIGN KEY (checkpoint_id) REFERENCES inventario_checkpoints(id)
+    ON UPDATE CASCADE
+    ON DELETE CASCADE
+);
+
+-- TABLA: activos_eliminados (borrados definitivos; sin FK: sobrevive al DELETE)
+-- El inventario a la fecha los quita desde su fecha de borrado
+CREATE TABLE IF NOT EXISTS activos_eliminados (
+  activo_id INTEGER PRIMARY KEY,
+  comite_id INTEGER,
+  fecha TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_checkpoints_fecha ON inventario_checkpoints(fecha);
+CREATE INDEX IF NOT EXISTS idx_cp_items_comite ON inventario_checkpoint_items(checkpoint_id, comite_id);
+CREATE INDEX IF NOT EXISTS idx_movimientos_fecha ON movimientos(fecha);
+CREATE INDEX IF NOT EXISTS idx_movimientos_archivo_fecha ON movimientos_archivo(fecha);
+CREATE INDEX IF NOT EXISTS idx_activos_eliminados_fecha ON activos_eliminados(fecha);
+
+-- =========================
+-- Detección de duplicados (duplicados.py)
+-- =========================
+
+-- TABLA: duplicados_firmas (versión ya procesada de cada activo)
+CREATE TABLE IF NOT EXISTS duplicados_firmas (
+  activo_id INTEGER PRIMARY KEY,
+  firma TEXT NOT NULL,
+
+  CONSTRAINT fk_dup_firmas_activo
+    FOREIGN KEY (activo_id) REFERENCES activos(id)
+    ON UPDATE CASCADE
+    ON DELETE CASCADE
+);
+
+-- TABLA: duplicados_bloques (clave de bloqueo -> activo)
+CREATE TABLE IF NOT EXISTS duplicados_bloques (
+  clave TEXT NOT NULL,
+  activo_id INTEGER NOT NULL,
+
+  PRIMARY KEY (clave, activo_id),
+
+  CONSTRAINT fk_dup_bloques_activo
+    FOREIGN KEY (activo_id) REFERENCES activos(id)
+    ON UPDATE CASCADE
+    ON DELETE CASCADE
+);
+
+-- TABLA: duplicados_candidatos (pares a revisar; activo_a < activo_b)
+CREATE TABLE IF NOT EXISTS duplicados_candidatos (
+  activo_a INTEGER NOT NULL,
+  activo_b INTEGER NOT NULL,
+  puntaje REAL NOT NULL,
+  estado TEXT NOT NULL DEFAULT 'PENDIENTE' CHECK (estado IN ('PENDIENTE','DESCARTADO','CONFIRMADO')),
+  fecha TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+
+  PRIMARY KEY (activo_a, activo_b),
+
+  CONSTRAINT fk_dup_cand_a
+    FOREIGN KEY (activo_a) REFERENCES activos(id)
+    ON UPDATE CASCADE
+    ON DELETE CASCADE,
+
+  CONSTRAINT fk_dup_cand_b
+    FOREIGN KEY (activo_b) REFERENCES activos(id)
+    ON UPDATE CASCADE
+    ON DELETE CASCADE
+);
+
+-- TABLA: duplicados_marcas (marcas de agua del job: una sola fila)
+CREATE TABLE IF NOT EXISTS duplicados_marcas (
+  id INTEGER PRIMARY KEY CHECK (id = 1),
+  max_activo_id INTEGER NOT NULL DEFAULT 0,
+  max_movimiento_id INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE INDEX IF NOT EXISTS idx_dup_bloques_activo ON duplicados_bloques(activo_id);
+CREATE INDEX IF NOT EXISTS idx_dup_cand_b ON duplicados_candidatos(activo_b);
+CREATE INDEX IF NOT EXISTS idx_dup_cand_estado ON duplicados_candidatos(estado, puntaje DESC);
+
+-- =========================
+-- Códigos automáticos por comité (codigos.py)
+-- =========================
+
+-- TABLA: codigo_series (prefijo + contador; se reserva por bloques con UPDATE ... RETURNING)
+CREATE TABLE IF NOT EXISTS codigo_series (
+  comite_id INTEGER PRIMARY KEY,
+  prefijo TEXT NOT NULL UNIQUE,
+  ancho INTEGER NOT NULL DEFAULT 5 CHECK (ancho BETWEEN 1 AND 12),
+  siguiente BIGINT NOT NULL DEFAULT 1 CHECK (siguiente >= 1),
+
+  CONSTRAINT fk_codigo_series_comite
+    FOREIGN KEY (comite_id) REFERENCES comites(id)
+    ON UPDATE CASCADE
+    ON DELETE CASCADE
+);
+
+-- =========================
+-- Resumen del Panel (resumen.py)
+-- =========================
+
+-- TABLA: resumen_activos (contadores por comité; los mantienen triggers sobre activos)
+CREATE TABLE IF NOT EXISTS resumen_activos (
+  comite_id INTEGER PRIMARY KEY,
+  total INTEGER NOT NULL DEFAULT 0,
+  activo INTEGER NOT NULL DEFAULT 0,
+  reparacion INTEGER NOT NULL DEFAULT 0,
+  baja INTEGER NOT NULL DEFAULT 0,
+  sin_responsable INTEGER NOT NULL DEFAULT 0,
+  sin_ubicacion INTEGER NOT NULL DEFAULT 0,
+  sin_categoria INTEGER NOT NULL DEFAULT 0
+);
+
+-- Carga inicial (solo si está vacía). Si hubo escrituras mientras se aplicaba:
+-- python resumen.py --reconstruir
+INSERT INTO resumen_activos(
+  comite_id, total, activo, reparacion, baja, sin_responsable, sin_ubicacion, sin_categoria
+)
+SELECT
+  comite_id,
+  COUNT(*),
+  SUM(CASE WHEN estado='ACTIVO' THEN 1 ELSE 0 END),
+  SUM(CASE WHEN estado='REPARACION' THEN 1 ELSE 0 END),
+  SUM(CASE WHEN estado='BAJA' THEN 1 ELSE 0 END),
+  SUM(CASE WHEN responsable_id IS NULL THEN 1 ELSE 0 END),
+  SUM(CASE WHEN ubicacion_id IS NULL THEN 1 ELSE 0 END),
+  SUM(CASE WHEN categoria_id IS NULL THEN 1 ELSE 0 END)
+FROM activos
+WHERE NOT EXISTS (SELECT 1 FROM resumen_activos)
+GROUP BY comite_id;
+
+-- Triggers: resta la fila vieja y suma la nueva en el comité que corresponda.
+-- En SQLite los mismos triggers están en schema_sqlite.sql.
+-- @solo-postgres
+CREATE OR REPLACE FUNCTION resumen_activos_trigger() RETURNS trigger AS $$
+BEGIN
+  IF TG_OP = 'UPDATE'
+     AND OLD.comite_id = NEW.comite_id
+     AND OLD.estado = NEW.estado
+     AND (OLD.responsable_id IS NULL) = (NEW.responsable_id IS NULL)
+     AND (OLD.ubicacion_id IS NULL) = (NEW.ubicacion_id IS NULL)
+     AND (OLD.categoria_id IS NULL) = (NEW.categoria_id IS NULL) THEN
+    RETURN NULL;
+  END IF;
+
+  IF TG_OP IN ('UPDATE', 'DELETE') THEN
+    UPDATE resumen_activos SET
+      total = total - 1,
+      activo = activo - CASE WHEN OLD.estado='ACTIVO' THEN 1 ELSE 0 END,
+      reparacion = reparacion - CASE WHEN OLD.estado='REPARACION' THEN 1 ELSE 0 END,
+      baja = baja - CASE WHEN OLD.estado='BAJA' THEN 1 ELSE 0 END,
+      sin_responsable = sin_responsable - CASE WHEN OLD.responsable_id IS NULL THEN 1 ELSE 0 END,
+      sin_ubicacion = sin_ubicacion - CASE WHEN OLD.ubicacion_id IS NULL THEN 1 ELSE 0 END,
+      sin_categoria = sin_categoria - CASE WHEN OLD.categoria_id IS NULL THEN 1 ELSE 0 END
+    WHERE comite_id = OLD.comite_id;
+  END IF;
+
+  IF TG_OP IN ('INSERT', 'UPDATE') THEN
+    INSERT INTO resumen_activos(comite_id) VALUES (NEW.comite_id) ON CONFLICT (comite_id) DO NOTHING;
+    UPDATE resumen_activos SET
+      total = total + 1,
+      activo = activo + CASE WHEN NEW.estado='ACTIVO' THEN 1 ELSE 0 END,
+      reparacion = reparacion + CASE WHEN NEW.estado='REPARACION' THEN 1 ELSE 0 END,
+      baja = baja + CASE WHEN NEW.estado='BAJA' THEN 1 ELSE 0 END,
+      sin_responsable = sin_responsable + CASE WHEN NEW.responsable_id IS NULL THEN 1 ELSE 0 END,
+      sin_ubicacion = sin_ubicacion + CASE WHEN NEW.ubicacion_id IS NULL THEN 1 ELSE 0 END,
+      sin_categoria = sin_categoria + CASE WHEN NEW.categoria_id IS NULL THEN 1 ELSE 0 END
+    WHERE comite_id = NEW.comite_id;
+  END IF;
+
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_resumen_activos ON activos;
+CREATE TRIGGER trg_resumen_activos
+AFTER INSERT OR DELETE OR UPDATE OF comite_id, estado, responsable_id, ubicacion_id, categoria_id
+ON activos
+FOR EACH ROW EXECUTE FUNCTION resumen_activos_trigger();
+-- @fin-solo-postgres
@@ -0,0 +1,66 @@
+-- =========================
+-- Solo SQLite: lo que en schema.sql está dentro de "-- @solo-postgres"
+-- (db.py lo aplica después del schema traducido)
+-- =========================
+
+-- Resumen del Panel: mismos deltas que resumen_activos_trigger() en schema.sql
+DROP TRIGGER IF EXISTS trg_resumen_activos_ins;
+CREATE TRIGGER trg_resumen_activos_ins
+AFTER INSERT ON activos
+BEGIN
+  INSERT OR IGNORE INTO resumen_activos(comite_id) VALUES (NEW.comite_id);
+  UPDATE resumen_activos SET
+    total = total + 1,
+    activo = activo + CASE WHEN NEW.estado='ACTIVO' THEN 1 ELSE 0 END,
+    reparacion = reparacion + CASE WHEN NEW.estado='REPARACION' THEN 1 ELSE 0 END,
+    baja = baja + CASE WHEN NEW.estado='BAJA' THEN 1 ELSE 0 END,
+    sin_responsable = sin_responsable + CASE WHEN NEW.responsable_id IS NULL THEN 1 ELSE 0 END,
+    sin_ubicacion = sin_ubicacion + CASE WHEN NEW.ubicacion_id IS NULL THEN 1 ELSE 0 END,
+    sin_categoria = sin_categoria + CASE WHEN NEW.categoria_id IS NULL THEN 1 ELSE 0 END
+  WHERE comite_id = NEW.comite_id;
+END;
+
+DROP TRIGGER IF EXISTS trg_resumen_activos_del;
+CREATE TRIGGER trg_resumen_activos_del
+AFTER DELETE ON activos
+BEGIN
+  UPDATE resumen_activos SET
+    total = total - 1,
+    activo = activo - CASE WHEN OLD.estado='ACTIVO' THEN 1 ELSE 0 END,
+    reparacion = reparacion - CASE WHEN OLD.estado='REPARACION' THEN 1 ELSE 0 END,
+    baja = baja - CASE WHEN OLD.estado='BAJA' THEN 1 ELSE 0 END,
+    sin_responsable = sin_responsable - CASE WHEN OLD.responsable_id IS NULL THEN 1 ELSE 0 END,
+    sin_ubicacion = sin_ubicacion - CASE WHEN OLD.ubicacion_id IS NULL THEN 1 ELSE 0 END,
+    sin_categoria = sin_categoria - CASE WHEN OLD.categoria_id IS NULL THEN 1 ELSE 0 END
+  WHERE comite_id = OLD.comite_id;
+END;
+
+DROP TRIGGER IF EXISTS trg_resumen_activos_upd;
+CREATE TRIGGER trg_resumen_activos_upd
+AFTER UPDATE OF comite_id, estado, responsable_id, ubicacion_id, categoria_id ON activos
+WHEN OLD.comite_id IS NOT NEW.comite_id
+  OR OLD.estado IS NOT NEW.estado
+  OR (OLD.responsable_id IS NULL) IS NOT (NEW.responsable_id IS NULL)
+  OR (OLD.ubicacion_id IS NULL) IS NOT (NEW.ubicacion_id IS NULL)
+  OR (OLD.categoria_id IS NULL) IS NOT (NEW.categoria_id IS NULL)
+BEGIN
+  UPDATE resumen_activos SET
+    total = total - 1,
+    activo = activo - CASE WHEN OLD.estado='ACTIVO' THEN 1 ELSE 0 END,
+    reparacion = reparacion - CASE WHEN OLD.estado='REPARACION' THEN 1 ELSE 0 END,
+    baja = baja - CASE WHEN OLD.estado='BAJA' THEN 1 ELSE 0 END,
+    sin_responsable = sin_responsable - CASE WHEN OLD.responsable_id IS NULL THEN 1 ELSE 0 END,
+    sin_ubicacion = sin_ubicacion - CASE WHEN OLD.ubicacion_id IS NULL THEN 1 ELSE 0 END,
+    sin_categoria = sin_categoria - CASE WHEN OLD.categoria_id IS NULL THEN 1 ELSE 0 END
+  WHERE comite_id = OLD.comite_id;
+  INSERT OR IGNORE INTO resumen_activos(comite_id) VALUES (NEW.comite_id);
+  UPDATE resumen_activos SET
+    total = total + 1,
+    activo = activo + CASE WHEN NEW.estado='ACTIVO' THEN 1 ELSE 0 END,
+    reparacion = reparacion + CASE WHEN NEW.estado='REPARACION' THEN 1 ELSE 0 END,
+    baja = baja + CASE WHEN NEW.estado='BAJA' THEN 1 ELSE 0 END,
+    sin_responsable = sin_responsable + CASE WHEN NEW.responsable_id IS NULL THEN 1 ELSE 0 END,
+    sin_ubicacion = sin_ubicacion + CASE WHEN NEW.ubicacion_id IS NULL THEN 1 ELSE 0 END,
+    sin_categoria = sin_categoria + CASE WHEN NEW.categoria_id IS NULL THEN 1 ELSE 0 END
+  WHERE comite_id = NEW.comite_id;
+END;